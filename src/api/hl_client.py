@@ -6,6 +6,7 @@ SDK の地雷 (equity二重計上、szi符号、leverage多態、STRING値等) 
 
 import os
 import time
+from dataclasses import dataclass
 
 import requests
 from hyperliquid.info import Info
@@ -350,10 +351,10 @@ class HLClient:
         resp = self.exchange.market_open(coin, is_buy, size, px=None, slippage=0.01)
         logger.info("Order response for %s: %s", coin, resp)
 
-        fill_price = _extract_fill_price(resp)
-        if _is_order_success(resp) and fill_price > 0:
+        parsed = _parse_order_response(resp)
+        if parsed.success and parsed.fill_price > 0:
             status = "filled"
-        elif _is_order_partial(resp):
+        elif parsed.partial:
             status = "partial"
         else:
             status = "failed"
@@ -361,7 +362,7 @@ class HLClient:
         return {
             "success": status in ("filled", "partial"),
             "status": status,
-            "fill_price": fill_price,
+            "fill_price": parsed.fill_price,
             "raw_response": resp,
             "error": None if status != "failed" else "order not filled",
         }
@@ -388,16 +389,13 @@ class HLClient:
                 "error": None,
             }
 
-        fill_price = _extract_fill_price(resp)
-        if _is_order_success(resp):
-            status = "closed"
-        else:
-            status = "failed"
+        parsed = _parse_order_response(resp)
+        status = "closed" if parsed.success else "failed"
 
         return {
             "success": status == "closed",
             "status": status,
-            "fill_price": fill_price,
+            "fill_price": parsed.fill_price,
             "raw_response": resp,
             "error": None if status == "closed" else "close order failed",
         }
@@ -436,55 +434,77 @@ class HLClient:
 #  Response parsers (module-level, used by HLClient and externally)
 # ------------------------------------------------------------------ #
 
+def _order_statuses(resp: dict) -> list:
+    """Return response.data.statuses of an order response, or [] if absent.
+
+    直接添字 + 例外で辿る (成功時に .get(..., {}) の空 dict を作らない)。
+    """
+    try:
+        response = resp["response"]
+        if response["type"] != "order":
+            return []
+        statuses = response["data"]["statuses"]
+    except (KeyError, TypeError, IndexError):
+        return []
+    return statuses if isinstance(statuses, list) else []
+
+
+@dataclass(frozen=True, slots=True)
+class OrderResult:
+    """Order response summary from a single pass over its statuses."""
+
+    success: bool
+    partial: bool
+    fill_price: float
+
+
+def _parse_order_response(resp: dict) -> OrderResult:
+    """Parse success / partial / fill price in one walk of the statuses.
+
+    success: status=ok かつ最初に現れた error/filled が filled。
+    partial: status=ok かつ resting を持つ status がある。
+    fill_price: 最初の filled.avgPx (status に関係なく)、無ければ 0.0。
+    """
+    ok = isinstance(resp, dict) and resp.get("status") == "ok"
+    success: bool | None = None
+    partial = False
+    fill_price: float | None = None
+    for s in _order_statuses(resp):
+        if not isinstance(s, dict):
+            continue
+        if ok and success is None:
+            if "error" in s:
+                logger.warning("Order error in statuses: %s", s["error"])
+                success = False
+            elif "filled" in s:
+                success = True
+        if ok and not partial and s.get("resting"):
+            partial = True
+        if fill_price is None:
+            filled = s.get("filled")
+            if isinstance(filled, dict):
+                try:
+                    fill_price = safe_float(filled.get("avgPx", 0), label="fill_price")
+                except (AttributeError, TypeError, ValueError) as e:
+                    logger.warning("Failed to extract fill price: %s", e)
+                    fill_price = 0.0
+    return OrderResult(
+        success=bool(success),
+        partial=partial,
+        fill_price=fill_price if fill_price is not None else 0.0,
+    )
+
+
 def _is_order_success(resp: dict) -> bool:
     """Check if exchange response indicates a fully filled order."""
-    if not isinstance(resp, dict) or resp.get("status") != "ok":
-        return False
-    response = resp.get("response", {})
-    if isinstance(response, dict) and response.get("type") == "order":
-        data = response.get("data", {})
-        if isinstance(data, dict):
-            statuses = data.get("statuses", [])
-            if isinstance(statuses, list) and statuses:
-                for s in statuses:
-                    if not isinstance(s, dict):
-                        continue
-                    if "error" in s:
-                        logger.warning("Order error in statuses: %s", s["error"])
-                        return False
-                    if "filled" in s:
-                        return True
-    return False
+    return _parse_order_response(resp).success
 
 
 def _is_order_partial(resp: dict) -> bool:
     """Check if an order is resting (partial fill or unfilled)."""
-    if not isinstance(resp, dict) or resp.get("status") != "ok":
-        return False
-    response = resp.get("response", {})
-    if isinstance(response, dict) and response.get("type") == "order":
-        data = response.get("data", {})
-        if isinstance(data, dict):
-            statuses = data.get("statuses", [])
-            if isinstance(statuses, list) and statuses:
-                return any(isinstance(s, dict) and s.get("resting") for s in statuses)
-    return False
+    return _parse_order_response(resp).partial
 
 
 def _extract_fill_price(resp: dict) -> float:
     """Extract fill price from exchange response, or 0.0."""
-    try:
-        if not isinstance(resp, dict):
-            return 0.0
-        response = resp.get("response", {})
-        if isinstance(response, dict) and response.get("type") == "order":
-            data = response.get("data", {})
-            if isinstance(data, dict):
-                for s in data.get("statuses", []):
-                    if isinstance(s, dict):
-                        filled = s.get("filled")
-                        if isinstance(filled, dict):
-                            return safe_float(filled.get("avgPx", 0), label="fill_price")
-    except (AttributeError, TypeError, ValueError) as e:
-        logger.warning("Failed to extract fill price: %s", e)
-    return 0.0
+    return _parse_order_response(resp).fill_price
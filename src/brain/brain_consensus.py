@@ -13,7 +13,12 @@ from src.strategy.wave_rider import WaveRider
 from src.utils.config_loader import get_project_root, load_settings
 from src.utils.file_lock import atomic_write_json, read_json
 from src.utils.logger import setup_logger
-from src.utils.retry import RetryExhausted, call_with_retry, enter_safe_hold
+from src.utils.retry import (
+    RetryExhausted,
+    call_with_retry,
+    enter_safe_hold,
+    install_shutdown_handler,
+)
 
 logger = setup_logger("brain_consensus")
 
@@ -1669,4 +1674,6 @@ def _write_fallback_and_exit(symbols: list[str], reason: str) -> None:
 
 
 if __name__ == "__main__":
+    # SIGTERM でリトライ待機を打ち切り、フォールバックを経て通常終了させる
+    install_shutdown_handler()
     main()
@@ -10,7 +10,12 @@ from src.utils.config_loader import (
 )
 from src.utils.file_lock import atomic_write_json, read_json
 from src.utils.logger import setup_logger
-from src.utils.retry import RetryExhausted, call_with_retry, enter_safe_hold
+from src.utils.retry import (
+    RetryExhausted,
+    call_with_retry,
+    enter_safe_hold,
+    install_shutdown_handler,
+)
 from src.utils.safe_parse import safe_float
 
 logger = setup_logger("data_collector")
@@ -265,4 +270,6 @@ def collect(settings: dict | None = None) -> dict:
 
 
 if __name__ == "__main__":
+    # SIGTERM でリトライ待機を打ち切り、フォールバックを経て通常終了させる
+    install_shutdown_handler()
     collect()
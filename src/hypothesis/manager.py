@@ -6,6 +6,7 @@
 """
 
 import math
+import operator
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -38,9 +39,10 @@ def _save_all(hypotheses: list[dict]) -> None:
     atomic_write_json(_hyp_path(), hypotheses)
 
 
-def _gen_id() -> str:
+def _gen_id(existing: list[dict] | None = None) -> str:
     now = datetime.now(timezone.utc)
-    existing = _load_all()
+    if existing is None:
+        existing = _load_all()
     today_prefix = f"hyp_{now.strftime('%Y%m%d')}"
     today_count = sum(1 for h in existing if h.get("id", "").startswith(today_prefix))
     return f"{today_prefix}_{today_count + 1:03d}"
@@ -55,36 +57,66 @@ def create_hypothesis(
     source: str = "",
 ) -> dict:
     """新規仮説を作成して保存。"""
+    created = create_hypotheses_bulk([{
+        "description": description,
+        "trigger": trigger,
+        "prediction": prediction,
+        "source": source,
+    }])
+    return created[0]
+
+
+def create_hypotheses_bulk(records: list[dict], source: str = "") -> list[dict]:
+    """複数の仮説を 1回の読み込み・1回の書き込みで作成して保存。
+
+    create_hypothesis を N 回呼ぶと毎回ファイル全体を読み直し・書き直すため、
+    まとめて登録する場合はこちらを使う。
+
+    Args:
+        records: description / trigger / prediction (任意で source) を持つ dict のリスト
+        source: record に source が無い場合に使う値
+
+    Returns:
+        records と同じ順序・長さのリスト。上限で弾かれた要素は {} 。
+    """
     settings = load_settings()
     max_hyp = settings.get("hypothesis", {}).get("max_hypotheses", 50)
 
     hypotheses = _load_all()
 
     # 上限チェック: active な仮説のみカウント
-    active = [h for h in hypotheses if h["status"] not in ("rejected", "demoted")]
-    if len(active) >= max_hyp:
-        logger.warning("Hypothesis limit reached (%d/%d). Rejecting.", len(active), max_hyp)
-        return {}
+    active_count = sum(1 for h in hypotheses if h["status"] not in ("rejected", "demoted"))
 
-    hyp = {
-        "id": _gen_id(),
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "status": "raw",
-        "source": source,
-        "description": description,
-        "trigger": trigger,
-        "prediction": prediction,
-        "backtest": None,
-        "strict_backtest": None,
-        "shadow": {"activations": 0, "wins": 0, "losses": 0, "total_pnl": 0.0, "results": []},
-        "live": {"activations": 0, "wins": 0, "losses": 0, "total_pnl": 0.0},
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }
+    results: list[dict] = []
+    for rec in records:
+        if active_count >= max_hyp:
+            logger.warning("Hypothesis limit reached (%d/%d). Rejecting.", active_count, max_hyp)
+            results.append({})
+            continue
 
-    hypotheses.append(hyp)
-    _save_all(hypotheses)
-    logger.info("Created hypothesis: %s - %s", hyp["id"], description[:80])
-    return hyp
+        now_iso = datetime.now(timezone.utc).isoformat()
+        hyp = {
+            "id": _gen_id(hypotheses),
+            "created_at": now_iso,
+            "status": "raw",
+            "source": rec.get("source", source),
+            "description": rec["description"],
+            "trigger": rec["trigger"],
+            "prediction": rec["prediction"],
+            "backtest": None,
+            "strict_backtest": None,
+            "shadow": {"activations": 0, "wins": 0, "losses": 0, "total_pnl": 0.0, "results": []},
+            "live": {"activations": 0, "wins": 0, "losses": 0, "total_pnl": 0.0},
+            "updated_at": now_iso,
+        }
+        hypotheses.append(hyp)
+        active_count += 1
+        results.append(hyp)
+        logger.info("Created hypothesis: %s - %s", hyp["id"], rec["description"][:80])
+
+    if any(results):
+        _save_all(hypotheses)
+    return results
 
 
 def update_status(hyp_id: str, new_status: str, results: dict | None = None) -> bool:
@@ -364,6 +396,17 @@ def _fft_spectral_features(closes: list[float], window: int) -> dict[str, float]
     }
 
 
+# 数値比較の演算子テーブル (if 連鎖の代わりに 1回の dict 引きで比較関数を得る)
+_NUM_OPS = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": lambda a, b: math.isclose(a, b, rel_tol=1e-6),
+    "!=": lambda a, b: not math.isclose(a, b, rel_tol=1e-6),
+}
+
+
 def _check_condition(condition: dict, features: dict[str, dict]) -> bool:
     """1つのトリガー条件を評価。"""
     field = condition.get("field", "")
@@ -395,19 +438,7 @@ def _check_condition(condition: dict, features: dict[str, dict]) -> bool:
     except (TypeError, ValueError):
         return False
 
-    if op == ">":
-        return actual > value
-    if op == "<":
-        return actual < value
-    if op == ">=":
-        return actual >= value
-    if op == "<=":
-        return actual <= value
-    if op == "==":
-        return math.isclose(actual, value, rel_tol=1e-6)
-    if op == "!=":
-        return not math.isclose(actual, value, rel_tol=1e-6)
-    return False
+    return _NUM_OPS[op](actual, value)
 
 
 def check_triggers(market_data: dict) -> list[dict]:
@@ -426,12 +457,13 @@ def check_triggers(market_data: dict) -> list[dict]:
         if not conditions:
             continue
 
-        results = [_check_condition(c, features) for c in conditions]
-
-        if logic == "AND" and all(results):
-            triggered.append(hyp)
-        elif logic == "OR" and any(results):
-            triggered.append(hyp)
+        # 条件は副作用なしなので all/any で短絡評価する
+        if logic == "AND":
+            if all(_check_condition(c, features) for c in conditions):
+                triggered.append(hyp)
+        elif logic == "OR":
+            if any(_check_condition(c, features) for c in conditions):
+                triggered.append(hyp)
 
     return triggered
 
@@ -6,32 +6,200 @@ BtcRubberWall や将来の AltReversal が継承して使う。
 ATRボラティリティ感度調整 (Volatility-Adaptive Sensitivity):
   高ボラ時: vol_threshold を引き上げてfalse positive (誤検知) を削減。
   低ボラ時: vol_threshold を引き下げて機会損失 (見逃し) を削減。
+
+列指向 (SoA) データ:
+  self.candles (dict のリスト) に加え、_t/_o/_c/_h/_l/_v の値リストを保持。
+  窓集計・終値列の切り出しは dict 参照を介さずリストのスライスで行う。
+  入力 (HL API の JSON) が dict のリストなので self.candles は互換用に残し、
+  scan の早期判定など毎サイクル通る箇所は列リストを参照する。
+
+インクリメンタル更新 (バックテスト用):
+  出来高 / (high-low) の累積和を保持し、窓合計を O(1) で取得する。
+  append() で1本ずつ追加すれば毎足の再構築 (_parse + 累積和 O(N)) が不要。
+  from_state() / export_state() で構築済み状態を引き継げる。
+  これらの状態は CandleView にまとめてあり、同一銘柄の複数戦略で共有できる。
 """
 
 from __future__ import annotations
 
+from bisect import bisect_right
+from functools import wraps
+from itertools import accumulate
+
+# export_state / from_state / append(max_len) で同期して扱う属性
+# (累積和は長さ n+1 だが先頭から同数削れば差分の整合性は保たれる)
+_STATE_KEYS = ("candles", "t", "o", "c", "h", "l", "v", "v_cs", "hl_cs")
+
+# 5分足1本のミリ秒 (_build_next_cache の仮想次足タイムスタンプ用)
+BAR_MS = 300_000
+
+
+def _parse_candles(raw: list[dict]) -> list[dict]:
+    """candle dict の値を float に変換。"""
+    parsed = []
+    for c in raw:
+        parsed.append({
+            "t": c.get("t", 0),
+            "o": float(c.get("o", 0)),
+            "c": float(c.get("c", 0)),
+            "h": float(c.get("h", 0)),
+            "l": float(c.get("l", 0)),
+            "v": float(c.get("v", 0)),
+        })
+    return parsed
+
+
+def scan_once_per_bar(scan):
+    """scan() 用デコレータ: 同じ確定足を再スキャンしない。
+
+    同一インスタンスで append されないまま scan() が再度呼ばれた場合
+    (足確定前のポーリング等)、計算せず (None, 前回の next_cache) を返す。
+    同じシグナルの二重発行も防ぐ。毎サイクル新規構築する場合は影響しない。
+    """
+    @wraps(scan)
+    def wrapper(self, cache: dict | None = None):
+        # 足の t ではなく view の世代で判定する (t 欠損の足は全て t=0 になるため)
+        gen = self.view.generation
+        if gen == self._last_scanned_gen:
+            return None, self._last_next_cache
+        signal, next_cache = scan(self, cache)
+        self._last_scanned_gen = gen
+        self._last_next_cache = next_cache
+        return signal, next_cache
+    return wrapper
+
+
+class CandleView:
+    """parse 済み足データ・列リスト・累積和のまとめ。
+
+    同一銘柄の candles で複数の戦略を動かす場合、1つの CandleView を
+    各戦略のコンストラクタに渡せば parse と累積和の構築は1回で済む。
+    append() はリストをその場で更新するため、共有中の全戦略に反映される。
+    """
+
+    def __init__(self, candles: list[dict]):
+        self.candles = _parse_candles(candles)
+        cs = self.candles
+        # 列指向 (SoA) の値リスト: ホットパスで dict 参照を避ける
+        self.t = [c["t"] for c in cs]
+        self.o = [c["o"] for c in cs]
+        self.c = [c["c"] for c in cs]
+        self.h = [c["h"] for c in cs]
+        self.l = [c["l"] for c in cs]
+        self.v = [c["v"] for c in cs]
+        # 累積和: v_cs[i] = sum(v[0:i]) (長さ len(candles)+1)
+        self.v_cs = list(accumulate(self.v, initial=0.0))
+        self.hl_cs = list(accumulate((h - l for h, l in zip(self.h, self.l)), initial=0.0))
+        # 内容の世代: append のたびに進む (scan_once_per_bar / _h4_range のメモ判定用)
+        self.generation = 0
+
+    @classmethod
+    def from_state(cls, state: dict) -> CandleView:
+        """export_state() の出力から再計算なしで復元 (state のリストを引き継ぐ)。"""
+        view = cls([])
+        for key in _STATE_KEYS:
+            setattr(view, key, state[key])
+        return view
+
+    def export_state(self) -> dict:
+        """構築済みの足データ・列リスト・累積和のコピーを返す (from_state 用)。
+
+        append はリストをその場で更新するため、コピーを渡して復元先の append が
+        この view (世代は進まない) を書き換えないようにする。
+        """
+        return {key: list(getattr(self, key)) for key in _STATE_KEYS}
+
+    def append(self, candle: dict, max_len: int | None = None) -> None:
+        """確定足を1本追加し、累積和を O(1) で更新。
+
+        Args:
+            candle: 追加する candle dict (未parseでも可)
+            max_len: 保持する最大本数。超過分は古い足から破棄
+                (コンストラクタに直近 max_len 本を渡した場合と同じ状態になる)
+        """
+        c = _parse_candles([candle])[0]
+        self.candles.append(c)
+        self.t.append(c["t"])
+        self.o.append(c["o"])
+        self.c.append(c["c"])
+        self.h.append(c["h"])
+        self.l.append(c["l"])
+        self.v.append(c["v"])
+        self.v_cs.append(self.v_cs[-1] + c["v"])
+        self.hl_cs.append(self.hl_cs[-1] + (c["h"] - c["l"]))
+        if max_len is not None and len(self.candles) > max_len:
+            drop = len(self.candles) - max_len
+            for key in _STATE_KEYS:
+                del getattr(self, key)[:drop]
+        self.generation += 1
+
 
 class BaseStrategy:
     """スパイクベース戦略の基底クラス。"""
 
-    def __init__(self, candles: list[dict], config: dict | None = None):
-        self.candles = self._parse(candles)
+    def __init__(self, candles: list[dict] | CandleView, config: dict | None = None):
+        view = candles if isinstance(candles, CandleView) else CandleView(candles)
+        self.view = view
         self.config = config or {}
+        # view のリストを直接参照 (append はその場更新なので束縛し直し不要)
+        self.candles = view.candles
+        self._t = view.t
+        self._o = view.o
+        self._c = view.c
+        self._h = view.h
+        self._l = view.l
+        self._v = view.v
+        self._v_cs = view.v_cs
+        self._hl_cs = view.hl_cs
+        # scan_once_per_bar 用: 最後にスキャンした時の view 世代と、その時の next_cache
+        self._last_scanned_gen: int | None = None
+        self._last_next_cache: dict = {}
+        # _h4_range の直近結果 ((世代, 始点idx, 終点idx), (low, high))
+        self._h4_memo: tuple | None = None
+
+    @classmethod
+    def from_state(cls, state: dict, config: dict | None = None) -> BaseStrategy:
+        """export_state() の出力から再計算なしでインスタンスを復元。"""
+        return cls(CandleView.from_state(state), config)
+
+    def export_state(self) -> dict:
+        """構築済みの足データ・列リスト・累積和を返す (from_state 用)。"""
+        return self.view.export_state()
+
+    def append(self, candle: dict, max_len: int | None = None) -> None:
+        """確定足を1本追加 (CandleView.append に委譲)。"""
+        self.view.append(candle, max_len=max_len)
+
+    def _vol_sum(self, start: int, end: int) -> float:
+        """candles[start:end] の出来高合計。O(1)。"""
+        return self._v_cs[end] - self._v_cs[start]
+
+    def _vol_mean(self, idx: int, window: int) -> float:
+        """idx 足までの直近 window 本の平均出来高。累積和で O(1)。"""
+        start = max(0, idx - window + 1)
+        return self._vol_sum(start, idx + 1) / (idx + 1 - start)
 
     @staticmethod
     def _parse(raw: list[dict]) -> list[dict]:
         """candle dict の値を float に変換。"""
-        parsed = []
-        for c in raw:
-            parsed.append({
-                "t": c.get("t", 0),
-                "o": float(c.get("o", 0)),
-                "c": float(c.get("c", 0)),
-                "h": float(c.get("h", 0)),
-                "l": float(c.get("l", 0)),
-                "v": float(c.get("v", 0)),
-            })
-        return parsed
+        return _parse_candles(raw)
+
+    def _vol_ratio_from_cache(self, cache: dict, idx: int, window: int) -> float:
+        """キャッシュの既知窓合計 (sum_known) を使って idx 足の出来高比率を計算。
+
+        _build_next_cache が前サイクルで出力した sum_known / n_known に
+        対象足の出来高を足すだけなので窓の再集計が不要。
+        旧形式キャッシュ (sum_known なし) では累積和から求める。
+        """
+        sum_known = cache.get("sum_known")
+        n_known = cache.get("n_known")
+        if sum_known is None or n_known is None:
+            start = max(0, idx - window + 1)
+            sum_known = self._vol_sum(start, idx)
+            n_known = idx - start
+        v = self._v[idx]
+        total = sum_known + v
+        return v * (n_known + 1) / total if total > 0 else 0.0
 
     def _vol_ratio(self, window: int = 288) -> list[float]:
         """各足の出来高比率 (window本の平均比) を計算。
@@ -46,9 +214,8 @@ class BaseStrategy:
         ratios = [0.0] * n
         for i in range(n):
             start = max(0, i - window + 1)
-            chunk = self.candles[start : i + 1]
-            avg = sum(c["v"] for c in chunk) / len(chunk) if chunk else 0
-            ratios[i] = self.candles[i]["v"] / avg if avg > 0 else 0.0
+            avg = self._vol_sum(start, i + 1) / (i + 1 - start)
+            ratios[i] = self._v[i] / avg if avg > 0 else 0.0
         return ratios
 
     def _h4_range(self, idx: int, h4_window: int = 48) -> tuple[float, float]:
@@ -66,13 +233,55 @@ class BaseStrategy:
             (h4_low, h4_high) タプル
         """
         start = max(0, idx - h4_window + 1)
-        chunk = self.candles[start : idx + 1]
-        if not chunk:
-            c = self.candles[idx]
-            return (c["l"], c["h"])
-        h4_low = min(c["l"] for c in chunk)
-        h4_high = max(c["h"] for c in chunk)
-        return (h4_low, h4_high)
+        if start > idx:
+            return (self._l[idx], self._h[idx])
+        # 同一窓の再計算を省く (ETH の A→B フォールオーバー等で同じ足に2回呼ばれる)。
+        # append で内容・インデックスがずれるため、キーに view の世代を含める。
+        key = (self.view.generation, start, idx)
+        memo = self._h4_memo
+        if memo is not None and memo[0] == key:
+            return memo[1]
+        # 列リストのスライスに組み込み min/max (C実装) を適用
+        result = (min(self._l[start : idx + 1]), max(self._h[start : idx + 1]))
+        self._h4_memo = (key, result)
+        return result
+
+    @staticmethod
+    def _compile_zones(zones: dict) -> tuple[list[float], list[tuple]] | None:
+        """ゾーン定義を range 下限でソートした二分探索用テーブルに変換。
+
+        Returns:
+            (下限リスト, [(上限, ゾーン名, ゾーン設定), ...])。
+            range が重なるゾーンがある場合は None (先勝ちの線形走査が必要)。
+        """
+        rows = sorted(
+            ((z["range"][0], z["range"][1], name, z) for name, z in zones.items()),
+            key=lambda r: r[0],
+        )
+        for prev, cur in zip(rows, rows[1:]):
+            if cur[0] < prev[1]:
+                return None
+        return [r[0] for r in rows], [(r[1], r[2], r[3]) for r in rows]
+
+    @staticmethod
+    def _match_zone(
+        pos: float, zones: dict, table: tuple[list[float], list[tuple]] | None,
+    ) -> tuple[str | None, dict | None]:
+        """4Hレンジ位置 pos が属するゾーン (lo <= pos < hi) を返す。
+
+        table (_compile_zones の出力) があれば bisect で O(log n)。
+        """
+        if table is None:
+            for zone_name, zcfg in zones.items():
+                lo, hi = zcfg["range"]
+                if lo <= pos < hi:
+                    return zone_name, zcfg
+            return None, None
+        los, rows = table
+        i = bisect_right(los, pos) - 1
+        if i >= 0 and pos < rows[i][0]:
+            return rows[i][1], rows[i][2]
+        return None, None
 
     @staticmethod
     def _range_position(close: float, h4_low: float, h4_high: float) -> float:
@@ -128,21 +337,14 @@ class BaseStrategy:
         if idx < short_window or n <= short_window:
             return 1.0, "normal"
 
-        # 短期ATR (直近short_window本)
+        # 短期ATR (直近short_window本): 累積和の差分で O(1)
+        hl_cs = self._hl_cs
         short_start = max(0, idx - short_window + 1)
-        short_chunk = self.candles[short_start : idx + 1]
-        short_atr = (
-            sum(c["h"] - c["l"] for c in short_chunk) / len(short_chunk)
-            if short_chunk else 0.0
-        )
+        short_atr = (hl_cs[idx + 1] - hl_cs[short_start]) / (idx + 1 - short_start)
 
         # 長期ATR (直近long_window本)
         long_start = max(0, idx - long_window + 1)
-        long_chunk = self.candles[long_start : idx + 1]
-        long_atr = (
-            sum(c["h"] - c["l"] for c in long_chunk) / len(long_chunk)
-            if long_chunk else 0.0
-        )
+        long_atr = (hl_cs[idx + 1] - hl_cs[long_start]) / (idx + 1 - long_start)
 
         if long_atr <= 0 or short_atr <= 0:
             return 1.0, "normal"
@@ -182,6 +384,19 @@ class BaseStrategy:
         else:
             return max(1, base_leverage - 2)
 
+    @staticmethod
+    def _ema_last(prices: list[float], period: int) -> float:
+        """prices 先頭を種にした EMA の最終値 (Pattern C/D/E 共通)。
+
+        スライスを作らずインデックスで回す。演算順は旧インライン版と同一。
+        """
+        k = 2.0 / (period + 1)
+        k1 = 1 - k
+        e = prices[0]
+        for i in range(1, len(prices)):
+            e = prices[i] * k + e * k1
+        return e
+
     def _rsi(self, idx: int, period: int = 14) -> float | None:
         """RSI (Relative Strength Index) を計算。
 
@@ -194,7 +409,7 @@ class BaseStrategy:
         """
         needed = period + 1
         start = max(0, idx - needed * 2 + 1)  # 余裕をもって取得
-        closes = [self.candles[i]["c"] for i in range(start, idx + 1)]
+        closes = self._c[start:idx + 1]
         if len(closes) < needed:
             return None
 
@@ -236,8 +451,8 @@ class BaseStrategy:
         start = max(0, idx - window)
         if start >= idx:
             return 0.0
-        base = self.candles[start]["c"]
-        current = self.candles[idx]["c"]
+        base = self._c[start]
+        current = self._c[idx]
         if base <= 0:
             return 0.0
         return (current - base) / base * 100.0
@@ -268,8 +483,7 @@ class BaseStrategy:
         if idx < needed:
             return False
 
-        def _bb_width(candles_slice: list[dict]) -> float:
-            closes = [c["c"] for c in candles_slice]
+        def _bb_width(closes: list[float]) -> float:
             mean = sum(closes) / len(closes)
             variance = sum((x - mean) ** 2 for x in closes) / len(closes)
             std = variance ** 0.5
@@ -278,7 +492,7 @@ class BaseStrategy:
             return (upper - lower) / mean if mean > 0 else 0.0
 
         # 現在のBB幅
-        current_slice = self.candles[max(0, idx - window + 1):idx + 1]
+        current_slice = self._c[max(0, idx - window + 1):idx + 1]
         if len(current_slice) < window:
             return False
         current_width = _bb_width(current_slice)
@@ -286,7 +500,7 @@ class BaseStrategy:
         # 長期の平均BB幅 (window本前の同窓)
         past_start = max(0, idx - window * 2 + 1)
         past_end = max(0, idx - window + 1)
-        past_slice = self.candles[past_start:past_end + window]
+        past_slice = self._c[past_start:past_end + window]
         if len(past_slice) < window:
             return False
         past_width = _bb_width(past_slice)
@@ -312,14 +526,13 @@ class BaseStrategy:
             平均ボディ比率 (0.0 - 1.0)
         """
         start = max(0, idx - window + 1)
-        chunk = self.candles[start:idx + 1]
-        if not chunk:
+        if start > idx:
             return 0.5
+        o, c, h, l = self._o, self._c, self._h, self._l
         ratios = []
-        for c in chunk:
-            body = abs(c["c"] - c["o"])
-            rng = c["h"] - c["l"]
-            ratios.append(body / rng if rng > 0 else 0.0)
+        for i in range(start, idx + 1):
+            rng = h[i] - l[i]
+            ratios.append(abs(c[i] - o[i]) / rng if rng > 0 else 0.0)
         return sum(ratios) / len(ratios)
 
     def scan(self) -> dict | None:
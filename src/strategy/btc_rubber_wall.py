@@ -64,7 +64,9 @@
 
 from __future__ import annotations
 
-from src.strategy.base import BaseStrategy
+import logging
+
+from src.strategy.base import BAR_MS, BaseStrategy, scan_once_per_bar
 from src.utils.logger import setup_logger
 
 logger = setup_logger("btc_rubber_wall")
@@ -124,30 +126,58 @@ class BtcRubberWall(BaseStrategy):
                 else:
                     merged[k] = v
         self.cfg = merged
+        # ホットパスで参照する設定値を属性に固定 (cfg の dict 参照を省く)
+        self._h4_window = merged["h4_window"]
+        self._vol_window = merged["vol_window"]
+        self._vol_threshold = merged["vol_threshold"]
+        self._quiet_long_enabled = merged.get("quiet_long_enabled", True)
+        self._ql_h4_min_pct = merged.get("quiet_long_h4_min_pct", 70)
+        self._ql_vol_ratio_max = merged.get("quiet_long_vol_ratio_max", 0.40)
+        self._ql_short_w = merged.get("quiet_long_vol_short_window", 5)
+        self._ql_long_w = merged.get("quiet_long_vol_long_window", 100)
+        self._ql_tp_pct = merged.get("quiet_long_tp_pct", 0.003)
+        self._ql_sl_pct = merged.get("quiet_long_sl_pct", 0.005)
+        self._ql_exit_bars = merged.get("quiet_long_exit_bars", 8)
+        # _build_next_cache の定常状態 (窓が埋まっている) 用係数: thr / (vol_window - thr)
+        steady_denom = self._vol_window - self._vol_threshold
+        self._steady_threshold_factor = (
+            self._vol_threshold / steady_denom if steady_denom > 0 else None
+        )
+        # ゾーン判定用の二分探索テーブル (cfg 確定後に1回だけ構築)
+        self._zone_table = self._compile_zones(merged["zones"])
 
+    @scan_once_per_bar
     def scan(self, cache: dict | None = None) -> tuple[dict | None, dict]:
         """直近確定足をチェック。BEARスパイク検知時にシグナルを返す。
 
         キャッシュあり → 閾値比較のみ O(1)
-        キャッシュなし → 対象足のみ計算 O(window)
+        キャッシュなし → 対象足のみ計算 (累積和で O(1))
         スパイク検知時のみゾーン分析を実行。
 
         Returns:
             (signal_or_None, next_cache) タプル
         """
-        if len(self.candles) < self.cfg["h4_window"] + 10:
+        if len(self.candles) < self._h4_window + 10:
             logger.warning("Insufficient candles: %d (need >= %d)",
-                           len(self.candles), self.cfg["h4_window"] + 10)
+                           len(self.candles), self._h4_window + 10)
             return None, {}
 
-        base_vol_threshold = self.cfg["vol_threshold"]
-        h4_window = self.cfg["h4_window"]
-
+        h4_window = self._h4_window
         idx = len(self.candles) - 2
         if idx < h4_window:
             return None, {}
 
+        candle = self.candles[idx]
+
+        # --- 早期リターン: スパイクになりえない足 (大半のサイクル) ---
+        # BEARでない、またはキャッシュ閾値未満 → VAS計算やログ整形をせず Pattern D のみ確認
+        # 判定は列リストから直接読む (candle dict は後段のパターン判定・シグナル生成用)
+        cache_hit = bool(cache) and cache.get("next_target_t") == self._t[idx]
+        if self._c[idx] >= self._o[idx] or (cache_hit and self._v[idx] < cache["threshold_vol"]):
+            return self._no_spike(idx, candle)
+
         # ATRボラティリティ感度調整: 高ボラ時は閾値引き上げ、低ボラ時は引き下げ
+        base_vol_threshold = self._vol_threshold
         vol_multiplier, vol_regime = self._atr_volatility_multiplier(idx)
         vol_threshold = base_vol_threshold * vol_multiplier
         if vol_regime != "normal":
@@ -156,68 +186,35 @@ class BtcRubberWall(BaseStrategy):
                 vol_regime, vol_multiplier, base_vol_threshold, vol_threshold,
             )
 
-        candle = self.candles[idx]
-        is_bear = candle["c"] < candle["o"]
-
-        # --- Fast path: キャッシュ閾値で O(1) 判定 ---
-        if cache and cache.get("next_target_t") == candle["t"]:
-            threshold_vol = cache["threshold_vol"]
-
-            if candle["v"] < threshold_vol or not is_bear:
-                next_cache = self._build_next_cache(idx)
-                # スパイクなし → Pattern D (quiet_long) を確認
-                if self.cfg.get("quiet_long_enabled", True):
-                    sig_d = self._pattern_d_quiet_long(idx, candle)
-                    if sig_d:
-                        return sig_d, next_cache
-                return None, next_cache
-
-            # スパイク検知 — ログ用に実際の ratio を計算
-            ratio = self._vol_ratio_single(idx)
+        if cache_hit:
+            # --- Fast path: キャッシュの既知窓合計で比率を算出 ---
+            ratio = self._vol_ratio_from_cache(cache, idx, self._vol_window)
             # キャッシュはbase閾値ベースなので、VAS調整後の閾値で再チェック
             if ratio < vol_threshold:
                 logger.info("Cache SPIKE but VAS-adjusted threshold=%.1f (regime=%s) filters out ratio=%.1f",
                             vol_threshold, vol_regime, ratio)
-                next_cache = self._build_next_cache(idx)
-                if self.cfg.get("quiet_long_enabled", True):
-                    sig_d = self._pattern_d_quiet_long(idx, candle)
-                    if sig_d:
-                        return sig_d, next_cache
-                return None, next_cache
+                return self._no_spike(idx, candle)
             logger.info("Cache hit SPIKE: vol=%.1f >= threshold=%.1f, ratio=%.1f (regime=%s)",
-                        candle["v"], threshold_vol, ratio, vol_regime)
+                        self._v[idx], cache["threshold_vol"], ratio, vol_regime)
         else:
-            # --- Slow path: 対象足だけ計算 O(window) ---
+            # --- Slow path: 対象足だけ計算 (累積和で O(1)) ---
             ratio = self._vol_ratio_single(idx)
+            if ratio < vol_threshold:
+                return self._no_spike(idx, candle)
 
-            if ratio < vol_threshold or not is_bear:
-                next_cache = self._build_next_cache(idx)
-                # スパイクなし → Pattern D (quiet_long) を確認
-                if self.cfg.get("quiet_long_enabled", True):
-                    sig_d = self._pattern_d_quiet_long(idx, candle)
-                    if sig_d:
-                        return sig_d, next_cache
-                return None, next_cache
-
-            logger.info("BEAR spike detected: vol_ratio=%.1f, change=%.2f%% (regime=%s)",
-                        ratio, (candle["c"] - candle["o"]) / candle["o"] * 100, vol_regime)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("BEAR spike detected: vol_ratio=%.1f, change=%.2f%% (regime=%s)",
+                            ratio, (self._c[idx] - self._o[idx]) / self._o[idx] * 100, vol_regime)
 
         # --- スパイク確定: ゾーン分析 (到達は稀) ---
+        close = self._c[idx]
         h4_low, h4_high = self._h4_range(idx - 1, h4_window)
-        pos = self._range_position(candle["c"], h4_low, h4_high)
+        pos = self._range_position(close, h4_low, h4_high)
 
         logger.info("4H range: low=%.2f, high=%.2f, close=%.2f, position=%.1f%%",
-                     h4_low, h4_high, candle["c"], pos)
-
-        zones = self.cfg["zones"]
-        matched_zone = None
-        matched_cfg = None
-        for zone_name, zcfg in zones.items():
-            lo, hi = zcfg["range"]
-            if lo <= pos < hi:
-                matched_zone = zone_name
-                matched_cfg = zcfg
-                break
+                     h4_low, h4_high, close, pos)
+
+        matched_zone, matched_cfg = self._match_zone(pos, self.cfg["zones"], self._zone_table)
 
         next_cache = self._build_next_cache(idx)
 
@@ -239,7 +236,7 @@ class BtcRubberWall(BaseStrategy):
         tp_pct = matched_cfg["tp_pct"]
         # sl_pct が明示指定されていれば使用、なければ tp_pct * 2 をフォールバック
         sl_pct = matched_cfg.get("sl_pct", tp_pct * 2)
-        entry_price = candle["c"]
+        entry_price = close
 
         # TP/SL 計算
         if direction == "short":
@@ -284,6 +281,15 @@ class BtcRubberWall(BaseStrategy):
                      direction, "BTC", entry_price, tp_price, sl_price, matched_zone)
         return signal, next_cache
 
+    def _no_spike(self, idx: int, candle: dict) -> tuple[dict | None, dict]:
+        """スパイクなし: Pattern D (quiet_long) のみ確認。"""
+        next_cache = self._build_next_cache(idx)
+        if self._quiet_long_enabled:
+            sig_d = self._pattern_d_quiet_long(idx, candle)
+            if sig_d:
+                return sig_d, next_cache
+        return None, next_cache
+
     def _pattern_d_quiet_long(self, idx: int, candle: dict) -> dict | None:
         """Pattern D: 低出来高 + GOLDEN クロス + 4H高位 → LONG (quiet_long)。
 
@@ -303,49 +309,37 @@ class BtcRubberWall(BaseStrategy):
           5. 直近6本の価格モメンタム > -0.1% (下落トレンド中のLONGを除外)
           6. ボディ品質 >= 0.25 (ドジ足連続を除外)
         """
-        h4_window = self.cfg["h4_window"]
-        h4_min_pct = self.cfg.get("quiet_long_h4_min_pct", 70)
-        vol_ratio_max = self.cfg.get("quiet_long_vol_ratio_max", 0.40)
-        short_w = self.cfg.get("quiet_long_vol_short_window", 5)
-        long_w = self.cfg.get("quiet_long_vol_long_window", 100)
-        tp_pct = self.cfg.get("quiet_long_tp_pct", 0.003)
-        sl_pct = self.cfg.get("quiet_long_sl_pct", 0.005)
-        exit_bars = self.cfg.get("quiet_long_exit_bars", 8)
-
-        # EMA計算
-        def _ema(prices: list[float], period: int) -> float:
-            k = 2.0 / (period + 1)
-            e = prices[0]
-            for p in prices[1:]:
-                e = p * k + e * (1 - k)
-            return e
+        h4_window = self._h4_window
+        h4_min_pct = self._ql_h4_min_pct
+        vol_ratio_max = self._ql_vol_ratio_max
+        short_w = self._ql_short_w
+        long_w = self._ql_long_w
+        tp_pct = self._ql_tp_pct
+        sl_pct = self._ql_sl_pct
+        exit_bars = self._ql_exit_bars
 
         # 1. EMA GOLDEN クロス確認
         if idx < 21:
             return None
-        closes = [c["c"] for c in self.candles[max(0, idx - 30):idx + 1]]
+        closes = self._c[max(0, idx - 30):idx + 1]
         if len(closes) < 22:
             return None
 
-        ema9 = _ema(closes, 9)
-        ema21 = _ema(closes, 21)
+        ema9 = self._ema_last(closes, 9)
+        ema21 = self._ema_last(closes, 21)
         if ema9 <= ema21:
             return None
 
         # 2. 4H range position (高位ゾーン確認: pos >= h4_min_pct)
         h4_low, h4_high = self._h4_range(idx - 1, h4_window)
-        entry = candle["c"]
+        entry = self._c[idx]
         pos = self._range_position(entry, h4_low, h4_high)
         if pos < h4_min_pct:
             return None
 
         # 3. 低出来高チェック (直近N本/長期M本 < 閾値)
-        short_start = max(0, idx - short_w + 1)
-        short_vols = [self.candles[j]["v"] for j in range(short_start, idx + 1)]
-        long_start = max(0, idx - long_w + 1)
-        long_vols = [self.candles[j]["v"] for j in range(long_start, idx + 1)]
-        short_avg = sum(short_vols) / len(short_vols) if short_vols else 0
-        long_avg = sum(long_vols) / len(long_vols) if long_vols else 0
+        short_avg = self._vol_mean(idx, short_w)
+        long_avg = self._vol_mean(idx, long_w)
         if long_avg <= 0:
             return None
         vol_ratio = short_avg / long_avg
@@ -391,14 +385,15 @@ class BtcRubberWall(BaseStrategy):
 
         rsi_str = f"RSI={rsi:.1f}" if rsi is not None else "RSI=n/a"
         squeeze_str = "BB_squeeze" if bb_squeeze else f"body={body_q:.2f}"
-        logger.info(
-            "Pattern D (quiet_long): ema9=%.2f>ema21=%.2f, pos=%.1f%% >= %d%%, "
-            "vol_ratio(5/100)=%.2f, %s, mom=%.3f%%, %s "
-            "→ LONG TP %.1f%% SL %.1f%% [CAPS: conf=%.2f → %dx]",
-            ema9, ema21, pos, h4_min_pct, vol_ratio,
-            rsi_str, momentum, squeeze_str,
-            tp_pct * 100, sl_pct * 100, confidence, leverage,
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Pattern D (quiet_long): ema9=%.2f>ema21=%.2f, pos=%.1f%% >= %d%%, "
+                "vol_ratio(5/100)=%.2f, %s, mom=%.3f%%, %s "
+                "→ LONG TP %.1f%% SL %.1f%% [CAPS: conf=%.2f → %dx]",
+                ema9, ema21, pos, h4_min_pct, vol_ratio,
+                rsi_str, momentum, squeeze_str,
+                tp_pct * 100, sl_pct * 100, confidence, leverage,
+            )
 
         signal = {
             "symbol": "BTC",
@@ -430,12 +425,9 @@ class BtcRubberWall(BaseStrategy):
         return signal
 
     def _vol_ratio_single(self, idx: int) -> float:
-        """単一足の出来高比率を計算。O(window)。"""
-        window = self.cfg["vol_window"]
-        start = max(0, idx - window + 1)
-        chunk = self.candles[start : idx + 1]
-        avg = sum(c["v"] for c in chunk) / len(chunk) if chunk else 0
-        return self.candles[idx]["v"] / avg if avg > 0 else 0.0
+        """単一足の出来高比率を計算。累積和で O(1)。"""
+        avg = self._vol_mean(idx, self._vol_window)
+        return self._v[idx] / avg if avg > 0 else 0.0
 
     def _build_next_cache(self, current_idx: int) -> dict:
         """次の足の閾値volumeを事前計算。
@@ -446,8 +438,8 @@ class BtcRubberWall(BaseStrategy):
           V * (N - threshold) >= threshold * sum_prev
           V >= threshold * sum_prev / (N - threshold)
         """
-        vol_window = self.cfg["vol_window"]
-        vol_threshold = self.cfg["vol_threshold"]
+        vol_window = self._vol_window
+        vol_threshold = self._vol_threshold
 
         # 次の対象足 = current_idx + 1
         # その window: [next_idx - vol_window + 1 .. next_idx] (N本)
@@ -456,23 +448,31 @@ class BtcRubberWall(BaseStrategy):
         next_idx = current_idx + 1
         start = max(0, next_idx - vol_window + 1)
         end = min(current_idx + 1, len(self.candles))
-        sum_known = sum(self.candles[i]["v"] for i in range(start, end))
+        sum_known = self._vol_sum(start, end)
         n_known = end - start
         n_total = n_known + 1
 
-        denominator = n_total - vol_threshold
-        if denominator <= 0:
-            threshold_vol = float("inf")
+        if n_total == vol_window and self._steady_threshold_factor is not None:
+            # 定常状態: 事前計算した係数を掛けるだけ
+            threshold_vol = sum_known * self._steady_threshold_factor
         else:
-            threshold_vol = vol_threshold * sum_known / denominator
+            # ウォームアップ中 (足数 < vol_window) は一般式
+            denominator = n_total - vol_threshold
+            if denominator <= 0:
+                threshold_vol = float("inf")
+            else:
+                threshold_vol = vol_threshold * sum_known / denominator
 
         # 次の対象足のタイムスタンプ
         if next_idx < len(self.candles):
-            next_t = self.candles[next_idx]["t"]
+            next_t = self._t[next_idx]
         else:
-            next_t = self.candles[current_idx]["t"] + 300_000  # 5min ms
+            next_t = self._t[current_idx] + BAR_MS
 
         return {
             "next_target_t": next_t,
-            "threshold_vol": round(threshold_vol, 4),
+            "threshold_vol": threshold_vol,  # 比較専用のため丸めない
+            # 次サイクルの Fast path で出来高比率を再集計せずに求めるため
+            "sum_known": sum_known,
+            "n_known": n_known,
         }
@@ -65,7 +65,9 @@ Pattern C (quiet_long):  スパイクなし + 低出来高 + GOLDEN + 4H低位 
 
 from __future__ import annotations
 
-from src.strategy.base import BaseStrategy
+import logging
+
+from src.strategy.base import BAR_MS, BaseStrategy, scan_once_per_bar
 from src.utils.logger import setup_logger
 
 logger = setup_logger("eth_rubber_band")
@@ -115,12 +117,45 @@ class EthRubberBand(BaseStrategy):
         if config:
             merged.update(config)
         self.cfg = merged
+        # ホットパスで参照する設定値を属性に固定 (cfg の dict 参照を省く)
+        self._h4_window = merged["h4_window"]
+        # 5m足の h4_window*12 本 = 48H * 12 = 576本 (Pattern C の 4H EMA 補助用)
+        self._h4_equiv_bars = self._h4_window * 12
+        self._vol_window = merged["vol_window"]
+        self._reversal_thr = merged["reversal_threshold"]
+        self._momentum_thr = merged["momentum_threshold"]
+        self._rev_tp_pct = merged["reversal_tp_pct"]
+        self._rev_sl_pad = merged["reversal_sl_pad_pct"]
+        self._rev_sl_min = merged["reversal_sl_min_dist"]
+        # 後方互換: 旧キー名 reversal_h4_filter_pct も読めるようにする (解決は構築時に一度だけ)
+        self._rev_h4_max_pct = merged.get("reversal_h4_max_pct",
+                                          merged.get("reversal_h4_filter_pct", 40))
+        self._mom_zone_min = merged["momentum_zone_min"]
+        self._mom_sl_pad = merged["momentum_sl_pad_pct"]
+        self._mom_sl_min = merged.get("momentum_sl_min_dist", 0.003)
+        self._mom_cut_bars = merged["momentum_cut_bars"]
+        self._mom_low_vol_skip = merged.get("momentum_low_vol_skip", True)
+        self._quiet_long_enabled = merged.get("quiet_long_enabled", True)
+        self._ql_h4_max_pct = merged.get("quiet_long_h4_max_pct", 35)
+        self._ql_vol_ratio_max = merged.get("quiet_long_vol_ratio_max", 0.60)
+        self._ql_short_w = merged.get("quiet_long_vol_short_window", 5)
+        self._ql_long_w = merged.get("quiet_long_vol_long_window", 100)
+        self._ql_tp_pct = merged.get("quiet_long_tp_pct", 0.004)
+        self._ql_sl_pct = merged.get("quiet_long_sl_pct", 0.006)
+        self._ql_cut_bars = merged.get("quiet_long_cut_bars", 10)
+        self._ql_use_4h_ema = merged.get("quiet_long_use_4h_ema", False)
+        # _build_next_cache の定常状態 (窓が埋まっている) 用係数: thr / (vol_window - thr)
+        steady_denom = self._vol_window - self._momentum_thr
+        self._steady_threshold_factor = (
+            self._momentum_thr / steady_denom if steady_denom > 0 else None
+        )
 
+    @scan_once_per_bar
     def scan(self, cache: dict | None = None) -> tuple[dict | None, dict]:
         """直近確定足をチェック。
 
         キャッシュあり → 閾値比較のみ O(1)
-        キャッシュなし → 対象足のみ計算 O(window)
+        キャッシュなし → 対象足のみ計算 (累積和で O(1))
 
         スキャン順序:
           1. Pattern A/B: BEARスパイク検知 (従来通り)
@@ -129,19 +164,26 @@ class EthRubberBand(BaseStrategy):
         Returns:
             (signal_or_None, next_cache) タプル
         """
-        if len(self.candles) < self.cfg["h4_window"] + 10:
+        if len(self.candles) < self._h4_window + 10:
             logger.warning("Insufficient candles: %d", len(self.candles))
             return None, {}
 
-        h4_window = self.cfg["h4_window"]
-        base_reversal_thr = self.cfg["reversal_threshold"]
-        base_momentum_thr = self.cfg["momentum_threshold"]
-
         idx = len(self.candles) - 2
-        if idx < h4_window:
+        if idx < self._h4_window:
             return None, {}
 
+        candle = self.candles[idx]
+
+        # --- 早期リターン: スパイクになりえない足 (大半のサイクル) ---
+        # BEARでない、またはキャッシュ閾値未満 → VAS計算やログ整形をせず Pattern C のみ確認
+        # 判定は列リストから直接読む (candle dict は後段のパターン判定・シグナル生成用)
+        cache_hit = bool(cache) and cache.get("next_target_t") == self._t[idx]
+        if self._c[idx] >= self._o[idx] or (cache_hit and self._v[idx] < cache["threshold_vol"]):
+            return self._no_spike(idx, candle)
+
         # ATRボラティリティ感度調整: 高ボラ時は閾値引き上げ、低ボラ時は引き下げ
+        base_reversal_thr = self._reversal_thr
+        base_momentum_thr = self._momentum_thr
         vol_multiplier, vol_regime = self._atr_volatility_multiplier(idx)
         reversal_thr = base_reversal_thr * vol_multiplier
         momentum_thr = base_momentum_thr * vol_multiplier
@@ -153,50 +195,19 @@ class EthRubberBand(BaseStrategy):
                 base_momentum_thr, momentum_thr,
             )
 
-        candle = self.candles[idx]
-        is_bear = candle["c"] < candle["o"]
-
-        if not is_bear:
-            next_cache = self._build_next_cache(idx)
-            # BEARでない → Pattern A/B はスキップ。Pattern C を確認
-            if self.cfg.get("quiet_long_enabled", True):
-                sig_c = self._pattern_c_quiet_long(idx, candle)
-                if sig_c:
-                    return sig_c, next_cache
-            return None, next_cache
-
-        # --- Fast path: キャッシュ閾値で判定 ---
-        if cache and cache.get("next_target_t") == candle["t"]:
-            threshold_vol = cache["threshold_vol"]
-            if candle["v"] < threshold_vol:
-                next_cache = self._build_next_cache(idx)
-                # スパイク閾値未満 → Pattern C を確認
-                if self.cfg.get("quiet_long_enabled", True):
-                    sig_c = self._pattern_c_quiet_long(idx, candle)
-                    if sig_c:
-                        return sig_c, next_cache
-                return None, next_cache
-            ratio = self._vol_ratio_single(idx)
+        if cache_hit:
+            # --- Fast path: キャッシュの既知窓合計で比率を算出 ---
+            ratio = self._vol_ratio_from_cache(cache, idx, self._vol_window)
             # VAS調整後の閾値で再チェック
             if ratio < momentum_thr:
                 logger.info("Cache SPIKE but VAS-adjusted momentum_thr=%.1f (regime=%s) filters out ratio=%.1f",
                             momentum_thr, vol_regime, ratio)
-                next_cache = self._build_next_cache(idx)
-                if self.cfg.get("quiet_long_enabled", True):
-                    sig_c = self._pattern_c_quiet_long(idx, candle)
-                    if sig_c:
-                        return sig_c, next_cache
-                return None, next_cache
+                return self._no_spike(idx, candle)
         else:
             ratio = self._vol_ratio_single(idx)
             if ratio < momentum_thr:
-                next_cache = self._build_next_cache(idx)
                 # スパイク閾値未満 → Pattern C を確認
-                if self.cfg.get("quiet_long_enabled", True):
-                    sig_c = self._pattern_c_quiet_long(idx, candle)
-                    if sig_c:
-                        return sig_c, next_cache
-                return None, next_cache
+                return self._no_spike(idx, candle)
 
         # --- パターン判定 (スパイクあり) ---
         # reversal_threshold 以上 → Pattern A (reversal LONG)
@@ -206,6 +217,15 @@ class EthRubberBand(BaseStrategy):
         else:
             return self._pattern_b_momentum(idx, candle, ratio, vol_regime, vol_multiplier)
 
+    def _no_spike(self, idx: int, candle: dict) -> tuple[dict | None, dict]:
+        """スパイクなし: Pattern A/B はスキップし Pattern C (quiet_long) のみ確認。"""
+        next_cache = self._build_next_cache(idx)
+        if self._quiet_long_enabled:
+            sig_c = self._pattern_c_quiet_long(idx, candle)
+            if sig_c:
+                return sig_c, next_cache
+        return None, next_cache
+
     def _pattern_a_reversal(
         self, idx: int, candle: dict, ratio: float,
         vol_regime: str = "normal", vol_multiplier: float = 1.0,
@@ -219,21 +239,22 @@ class EthRubberBand(BaseStrategy):
           30日BT n=27: pos<40% → WR=70%, pos>=40% → WR=25%
           4H高値圏 (pos>=40%) での逆張りLONGは不利。低位ゾーンのみ許可。
         """
-        h4_window = self.cfg["h4_window"]
-        # 後方互換: 旧キー名 reversal_h4_filter_pct も読めるようにする
-        h4_max_pct = self.cfg.get("reversal_h4_max_pct",
-                                   self.cfg.get("reversal_h4_filter_pct", 40))
+        h4_window = self._h4_window
+        h4_max_pct = self._rev_h4_max_pct
+
+        # 価格は列リストから一度だけ読む (candle dict の再参照を避ける)
+        entry = self._c[idx]
 
         # --- 4Hトレンドフィルター (上限) ---
         h4_low, h4_high = self._h4_range(idx - 1, h4_window)
-        h4_pos = self._range_position(candle["c"], h4_low, h4_high)
+        h4_pos = self._range_position(entry, h4_low, h4_high)
 
         if h4_pos >= h4_max_pct:
             # 4H高値圏では逆張りLONG不利 (30日BT: pos>=40%でWR=25%)
             # フォールオーバー: 強スパイク(reversal_thr以上)が高値圏に来た場合、
             # Pattern B相当のSHORT momentumが有効か判定する
             # (通常Pattern Bはratio<reversal_thrのみ対象だが、高値圏での強BEARはSHORT有利)
-            zone_min = self.cfg["momentum_zone_min"]
+            zone_min = self._mom_zone_min
             if h4_pos >= zone_min:
                 logger.info(
                     "Pattern A→B fallover: pos=%.1f%% >= max=%d%%, vol_ratio=%.1f >= reversal_thr "
@@ -248,27 +269,28 @@ class EthRubberBand(BaseStrategy):
             )
             return None, self._build_next_cache(idx)
 
-        tp_pct = self.cfg["reversal_tp_pct"]
-        sl_pad = self.cfg["reversal_sl_pad_pct"]
-        sl_min_dist = self.cfg["reversal_sl_min_dist"]
-        entry = candle["c"]
+        tp_pct = self._rev_tp_pct
+        sl_pad = self._rev_sl_pad
+        sl_min_dist = self._rev_sl_min
 
         # SL = candle low に pad を加えた値
-        sl_from_candle = round(candle["l"] * (1 - sl_pad), 2)
+        sl_from_candle = round(self._l[idx] * (1 - sl_pad), 2)
         sl_from_min = round(entry * (1 - sl_min_dist), 2)
         # 最低 SL 距離を保証 (0.25%): candle low SL と最低距離 SL の低い方を採用
-        sl_price = min(sl_from_candle, sl_from_min)
+        sl_price = sl_from_min if sl_from_min < sl_from_candle else sl_from_candle
         sl_dist = (entry - sl_price) / entry
 
         tp_price = round(entry * (1 + tp_pct), 2)
 
-        logger.info(
-            "Pattern A (reversal): vol_ratio=%.1f, change=%.2f%%, "
-            "SL=%.2f (candle_low=%.2f, min_dist=%.2f, sl_dist=%.2f%%), "
-            "4H pos=%.1f%%",
-            ratio, (candle["c"] - candle["o"]) / candle["o"] * 100,
-            sl_price, sl_from_candle, sl_from_min, sl_dist * 100, h4_pos,
-        )
+        if logger.isEnabledFor(logging.INFO):
+            change_pct = (entry - self._o[idx]) / self._o[idx] * 100
+            logger.info(
+                "Pattern A (reversal): vol_ratio=%.1f, change=%.2f%%, "
+                "SL=%.2f (candle_low=%.2f, min_dist=%.2f, sl_dist=%.2f%%), "
+                "4H pos=%.1f%%",
+                ratio, change_pct,
+                sl_price, sl_from_candle, sl_from_min, sl_dist * 100, h4_pos,
+            )
 
         vas_note = f" [VAS:{vol_regime}x{vol_multiplier:.2f}]" if vol_regime != "normal" else ""
         signal = {
@@ -312,11 +334,12 @@ class EthRubberBand(BaseStrategy):
         注意: 30日BTでupper(40-100%)+vol>=5x の勝率は31%と低い。モニタリング要。
         2/20実例: +0.56%上昇でSLヒット。0.35%でも一部は防げないが耐性向上。
         """
-        h4_window = self.cfg["h4_window"]
-        zone_min = self.cfg["momentum_zone_min"]
+        h4_window = self._h4_window
+        zone_min = self._mom_zone_min
 
+        entry = self._c[idx]
         h4_low, h4_high = self._h4_range(idx - 1, h4_window)
-        pos = self._range_position(candle["c"], h4_low, h4_high)
+        pos = self._range_position(entry, h4_low, h4_high)
 
         logger.info(
             "Pattern B check: vol_ratio=%.1f, 4H pos=%.1f%% (need >= %d%%)",
@@ -332,23 +355,22 @@ class EthRubberBand(BaseStrategy):
         # low_vol regime スキップ: 低ボラ市場での偽スパイク防止
         # VAS補正で閾値が緩んだ結果、本来は弱いスパイクが通過するリスクを防ぐ
         # 2/21実例: vol_regime=low_vol でのB_momentum 4件がWR=0% (BT=88%との大幅乖離)
-        if vol_regime == "low_vol" and self.cfg.get("momentum_low_vol_skip", True):
+        if vol_regime == "low_vol" and self._mom_low_vol_skip:
             logger.info(
                 "Pattern B: SKIP (vol_regime=low_vol → 低ボラ市場では偽スパイクリスク高。"
                 "momentum_low_vol_skip=True)"
             )
             return None, next_cache
 
-        sl_pad = self.cfg["momentum_sl_pad_pct"]
-        sl_min_dist = self.cfg.get("momentum_sl_min_dist", 0.003)
-        cut_bars = self.cfg["momentum_cut_bars"]
-        entry = candle["c"]
+        sl_pad = self._mom_sl_pad
+        sl_min_dist = self._mom_sl_min
+        cut_bars = self._mom_cut_bars
 
         # SL = candle high に pad を加えた値
         # 最低SL距離 0.30% を保証 (旧0.20%→0.30%: ノイズ耐性向上)
-        sl_from_candle = round(candle["h"] * (1 + sl_pad), 2)
+        sl_from_candle = round(self._h[idx] * (1 + sl_pad), 2)
         sl_from_min = round(entry * (1 + sl_min_dist), 2)
-        sl_price = max(sl_from_candle, sl_from_min)
+        sl_price = sl_from_min if sl_from_min > sl_from_candle else sl_from_candle
         sl_dist = (sl_price - entry) / entry
 
         # TP は時間カットなので設定しない (brain 側で管理)
@@ -405,49 +427,67 @@ class EthRubberBand(BaseStrategy):
           5. 直近6本の価格モメンタム > -0.2% (急落中のナイフキャッチ禁止)
           6. ボディ品質 >= 0.25 OR BBスクイーズ (ドジ足ノイズ状態を除外)
         """
-        h4_window = self.cfg["h4_window"]
-        h4_max_pct = self.cfg.get("quiet_long_h4_max_pct", 35)
-        vol_ratio_max = self.cfg.get("quiet_long_vol_ratio_max", 0.60)
-        short_w = self.cfg.get("quiet_long_vol_short_window", 5)
-        long_w = self.cfg.get("quiet_long_vol_long_window", 100)
-        tp_pct = self.cfg.get("quiet_long_tp_pct", 0.004)
-        sl_pct = self.cfg.get("quiet_long_sl_pct", 0.006)
-        cut_bars = self.cfg.get("quiet_long_cut_bars", 10)
-        use_4h_ema = self.cfg.get("quiet_long_use_4h_ema", False)
-
-        # EMA計算ユーティリティ (直近N本のみ使用)
-        def _ema(prices: list[float], period: int) -> float:
-            k = 2.0 / (period + 1)
-            e = prices[0]
-            for p in prices[1:]:
-                e = p * k + e * (1 - k)
-            return e
+        h4_window = self._h4_window
+        h4_max_pct = self._ql_h4_max_pct
+        vol_ratio_max = self._ql_vol_ratio_max
+        short_w = self._ql_short_w
+        long_w = self._ql_long_w
+        tp_pct = self._ql_tp_pct
+        sl_pct = self._ql_sl_pct
+        cut_bars = self._ql_cut_bars
+        use_4h_ema = self._ql_use_4h_ema
 
-        # 1. EMA クロス確認 (GOLDEN: EMA9 > EMA21)
         if idx < 21:
             return None
-        closes = [c["c"] for c in self.candles[max(0, idx - 30):idx + 1]]
+
+        # 判定順は安い・落としやすい順 (出来高 → 4H位置 → EMA)。
+        # 全条件の AND なので結果は条件番号順と同じ。EMA (最大300本×2) は残った足だけ計算する。
+
+        # 3. 低出来高チェック (直近N本/長期M本 < 閾値)
+        short_avg = self._vol_mean(idx, short_w)
+        long_avg = self._vol_mean(idx, long_w)
+        if long_avg <= 0:
+            return None
+        vol_ratio = short_avg / long_avg
+        if vol_ratio >= vol_ratio_max:
+            return None
+
+        # 2. 4H range position (底値圏チェック)
+        h4_low, h4_high = self._h4_range(idx - 1, h4_window)
+        entry = self._c[idx]
+        pos = self._range_position(entry, h4_low, h4_high)
+        if pos >= h4_max_pct:
+            # 直前まで発火していた境界ゾーン (h4_max_pct-5 ~ h4_max_pct) はtimeout多発傾向
+            # 2026-02-21 BT: 43-50%ゾーンはtimeout 5/12件 → h4_max_pct=45%で除外済み
+            if pos < h4_max_pct + 10:
+                logger.info(
+                    "Pattern C: SKIP (4H pos=%.1f%% >= max=%d%%, 境界ゾーン=%.1f%%~%d%%. "
+                    "timeout多発ゾーン: h4_max_pctを引き下げても同様ならさらに絞り込みを検討)",
+                    pos, h4_max_pct, h4_max_pct, h4_max_pct + 10,
+                )
+            return None
+
+        # 1. EMA クロス確認 (GOLDEN: EMA9 > EMA21)
+        closes = self._c[max(0, idx - 30):idx + 1]
         if len(closes) < 22:
             return None
 
-        ema9 = _ema(closes, 9)
-        ema21 = _ema(closes, 21)
+        ema9 = self._ema_last(closes, 9)
+        ema21 = self._ema_last(closes, 21)
         ema_golden_5m = ema9 > ema21
 
         # 4H EMA 補助チェック (use_4h_ema=true の場合: 5m DEAD でも 4H GOLDEN なら許可)
         ema_golden_4h = False
         if use_4h_ema and not ema_golden_5m:
-            h4_low, h4_high = self._h4_range(idx - 1, h4_window)
             # 4H足は self.candles (5m) の h4_window * 12 本分に相当
             # ここでは 5m candles から 4H相当の EMA を近似計算
-            # 5m足の h4_window*12 本 = 48H * 12 = 576本を使用
-            h4_equiv_bars = h4_window * 12  # 48H * 12本/H = 576本
-            h4_start = max(0, idx - h4_equiv_bars + 1)
-            h4_closes = [c["c"] for c in self.candles[h4_start:idx + 1]]
-            if len(h4_closes) >= 50:
+            # (実際に EMA に渡すのは末尾最大300本なので、その分だけ切り出す)
+            h4_len = min(idx + 1, self._h4_equiv_bars)
+            if h4_len >= 50:
+                closes_4h = self._c[idx + 1 - min(h4_len, 300):idx + 1]
                 # 4H相当の EMA を 5m足での等価ピリオドで計算 (9H=9*12=108本, 21H=21*12=252本)
-                ema9_4h_equiv = _ema(h4_closes[-min(len(h4_closes), 300):], 108)
-                ema21_4h_equiv = _ema(h4_closes[-min(len(h4_closes), 300):], 252)
+                ema9_4h_equiv = self._ema_last(closes_4h, 108)
+                ema21_4h_equiv = self._ema_last(closes_4h, 252)
                 ema_golden_4h = ema9_4h_equiv > ema21_4h_equiv
                 if ema_golden_4h:
                     logger.info(
@@ -459,34 +499,6 @@ class EthRubberBand(BaseStrategy):
         if not ema_golden_5m and not ema_golden_4h:
             return None
 
-        # 2. 4H range position (底値圏チェック)
-        h4_low, h4_high = self._h4_range(idx - 1, h4_window)
-        entry = candle["c"]
-        pos = self._range_position(entry, h4_low, h4_high)
-        if pos >= h4_max_pct:
-            # 直前まで発火していた境界ゾーン (h4_max_pct-5 ~ h4_max_pct) はtimeout多発傾向
-            # 2026-02-21 BT: 43-50%ゾーンはtimeout 5/12件 → h4_max_pct=45%で除外済み
-            if pos < h4_max_pct + 10:
-                logger.info(
-                    "Pattern C: SKIP (4H pos=%.1f%% >= max=%d%%, 境界ゾーン=%.1f%%~%d%%. "
-                    "timeout多発ゾーン: h4_max_pctを引き下げても同様ならさらに絞り込みを検討)",
-                    pos, h4_max_pct, h4_max_pct, h4_max_pct + 10,
-                )
-            return None
-
-        # 3. 低出来高チェック (直近N本/長期M本 < 閾値)
-        short_start = max(0, idx - short_w + 1)
-        short_vols = [self.candles[j]["v"] for j in range(short_start, idx + 1)]
-        long_start = max(0, idx - long_w + 1)
-        long_vols = [self.candles[j]["v"] for j in range(long_start, idx + 1)]
-        short_avg = sum(short_vols) / len(short_vols) if short_vols else 0
-        long_avg = sum(long_vols) / len(long_vols) if long_vols else 0
-        if long_avg <= 0:
-            return None
-        vol_ratio = short_avg / long_avg
-        if vol_ratio >= vol_ratio_max:
-            return None
-
         # 4. RSIフィルター: 底値圏でもRSI過熱(>=55)でのLONG禁止
         rsi = self._rsi(idx, period=14)
         if rsi is not None and rsi >= 55.0:
@@ -534,14 +546,15 @@ class EthRubberBand(BaseStrategy):
 
         rsi_str = f"RSI={rsi:.1f}" if rsi is not None else "RSI=n/a"
         squeeze_str = "BB_squeeze" if bb_squeeze else f"body={body_q:.2f}"
-        logger.info(
-            "Pattern C (quiet_long): ema_src=%s ema9=%.2f>ema21=%.2f, pos=%.1f%% < %d%%, "
-            "vol_ratio(5/100)=%.2f, %s, mom=%.3f%%, %s "
-            "→ LONG TP %.1f%% SL %.1f%% [CAPS: conf=%.2f → %dx]",
-            ema_source, ema9, ema21, pos, h4_max_pct, vol_ratio,
-            rsi_str, momentum, squeeze_str,
-            tp_pct * 100, sl_pct * 100, confidence, leverage,
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Pattern C (quiet_long): ema_src=%s ema9=%.2f>ema21=%.2f, pos=%.1f%% < %d%%, "
+                "vol_ratio(5/100)=%.2f, %s, mom=%.3f%%, %s "
+                "→ LONG TP %.1f%% SL %.1f%% [CAPS: conf=%.2f → %dx]",
+                ema_source, ema9, ema21, pos, h4_max_pct, vol_ratio,
+                rsi_str, momentum, squeeze_str,
+                tp_pct * 100, sl_pct * 100, confidence, leverage,
+            )
 
         signal = {
             "symbol": "ETH",
@@ -573,12 +586,9 @@ class EthRubberBand(BaseStrategy):
         return signal
 
     def _vol_ratio_single(self, idx: int) -> float:
-        """単一足の出来高比率。O(window)。"""
-        window = self.cfg["vol_window"]
-        start = max(0, idx - window + 1)
-        chunk = self.candles[start : idx + 1]
-        avg = sum(c["v"] for c in chunk) / len(chunk) if chunk else 0
-        return self.candles[idx]["v"] / avg if avg > 0 else 0.0
+        """単一足の出来高比率。累積和で O(1)。"""
+        avg = self._vol_mean(idx, self._vol_window)
+        return self._v[idx] / avg if avg > 0 else 0.0
 
     def _build_next_cache(self, current_idx: int) -> dict:
         """次の足の閾値volumeを事前計算。
@@ -586,28 +596,36 @@ class EthRubberBand(BaseStrategy):
         momentum_threshold (最低ライン) を基準に閾値を算出。
         これを下回れば Pattern A/B どちらもありえない。
         """
-        vol_window = self.cfg["vol_window"]
-        threshold = self.cfg["momentum_threshold"]
+        vol_window = self._vol_window
+        threshold = self._momentum_thr
 
         next_idx = current_idx + 1
         start = max(0, next_idx - vol_window + 1)
         end = min(current_idx + 1, len(self.candles))
-        sum_known = sum(self.candles[i]["v"] for i in range(start, end))
+        sum_known = self._vol_sum(start, end)
         n_known = end - start
         n_total = n_known + 1
 
-        denom = n_total - threshold
-        if denom <= 0:
-            threshold_vol = float("inf")
+        if n_total == vol_window and self._steady_threshold_factor is not None:
+            # 定常状態: 事前計算した係数を掛けるだけ
+            threshold_vol = sum_known * self._steady_threshold_factor
         else:
-            threshold_vol = threshold * sum_known / denom
+            # ウォームアップ中 (足数 < vol_window) は一般式
+            denom = n_total - threshold
+            if denom <= 0:
+                threshold_vol = float("inf")
+            else:
+                threshold_vol = threshold * sum_known / denom
 
         if next_idx < len(self.candles):
-            next_t = self.candles[next_idx]["t"]
+            next_t = self._t[next_idx]
         else:
-            next_t = self.candles[current_idx]["t"] + 300_000
+            next_t = self._t[current_idx] + BAR_MS
 
         return {
             "next_target_t": next_t,
-            "threshold_vol": round(threshold_vol, 4),
+            "threshold_vol": threshold_vol,  # 比較専用のため丸めない
+            # 次サイクルの Fast path で出来高比率を再集計せずに求めるため
+            "sum_known": sum_known,
+            "n_known": n_known,
         }
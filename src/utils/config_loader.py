@@ -1,22 +1,37 @@
 """Configuration loader for myClaw."""
 
+import copy
 import os
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
 
 
+@lru_cache(maxsize=None)
 def get_project_root() -> Path:
-    """Return the project root directory."""
+    """Return the project root directory (resolved once per process)."""
     return Path(__file__).resolve().parent.parent.parent
 
 
-def load_yaml(filepath: Path) -> dict:
-    """Load a YAML file and return as dict."""
-    with open(filepath, "r") as f:
+@lru_cache(maxsize=8)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse a YAML file once per (path, mtime, size)."""
+    with open(path, "r") as f:
         return yaml.safe_load(f) or {}
 
 
+def load_yaml(filepath: Path) -> dict:
+    """Load a YAML file and return as dict.
+
+    Parsed results are cached until the file's mtime or size changes, so
+    repeated get_*_dir() / load_settings() calls skip re-parsing. Callers get
+    a deep copy and may mutate it freely.
+    """
+    st = os.stat(filepath)
+    return copy.deepcopy(_load_yaml_cached(str(filepath), st.st_mtime_ns, st.st_size))
+
+
 def load_settings() -> dict:
     """Load global settings from config/settings.yaml."""
     root = get_project_root()
@@ -1,15 +1,45 @@
 """GPG-encrypted secrets management."""
 
+import hashlib
 import os
+import re
 import subprocess
+import threading
+import time
 from pathlib import Path
 
 from src.utils.config_loader import get_project_root
 
+# Decrypted secrets are kept in-process for a short TTL so that retry loops and
+# repeated HLClient construction don't fork gpg (and re-run its KDF) each time.
+# Keyed by a digest of the passphrase plus the .gpg file's mtime, so a rotated
+# file or a different passphrase always triggers a fresh decrypt.
+_CACHE_TTL = float(os.environ.get("MYCLAW_SECRETS_TTL", "300"))
+_cache_lock = threading.Lock()
+_secrets_cache: tuple[tuple[bytes, int], float, dict[str, str]] | None = None
+
+# KEY=VALUE lines of the decrypted env file, parsed in one pass. Blank lines and
+# "#" comments never match the key pattern. [^\S\n] is "whitespace except
+# newline", so an empty value can't swallow the next line and CRLF is trimmed.
+_ENV_LINE_RE = re.compile(
+    r"^[^\S\n]*([A-Za-z_][A-Za-z0-9_]*)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$",
+    re.MULTILINE,
+)
+
+
+def clear_secrets_cache() -> None:
+    """Drop cached decrypted secrets (e.g. after key rotation or in tests)."""
+    global _secrets_cache
+    with _cache_lock:
+        _secrets_cache = None
+
 
 def decrypt_secrets(passphrase: str | None = None) -> dict[str, str]:
     """Decrypt secrets.env.gpg and return as key-value dict.
 
+    Results are cached in-process for MYCLAW_SECRETS_TTL seconds
+    (default 300, 0 disables); see clear_secrets_cache().
+
     Args:
         passphrase: GPG passphrase. If None, reads from
                     MYCLAW_GPG_PASSPHRASE environment variable.
@@ -30,27 +60,35 @@ def decrypt_secrets(passphrase: str | None = None) -> dict[str, str]:
     if not gpg_file.exists():
         raise FileNotFoundError(f"Encrypted secrets not found: {gpg_file}")
 
+    global _secrets_cache
+    passphrase_bytes = passphrase.encode()
+    key = (hashlib.sha256(passphrase_bytes).digest(), gpg_file.stat().st_mtime_ns)
+    with _cache_lock:
+        cached = _secrets_cache
+        if cached is not None and cached[0] == key and time.monotonic() - cached[1] < _CACHE_TTL:
+            return dict(cached[2])
+
+        secrets = _run_gpg_decrypt(gpg_file, passphrase_bytes)
+        if _CACHE_TTL > 0:
+            _secrets_cache = (key, time.monotonic(), secrets)
+        return dict(secrets)
+
+
+def _run_gpg_decrypt(gpg_file: Path, passphrase: bytes) -> dict[str, str]:
+    """Run gpg on the encrypted file and parse KEY=VALUE lines."""
     result = subprocess.run(
         [
             "gpg", "--quiet", "--batch", "--yes",
             "--passphrase-fd", "0",
             "--decrypt", str(gpg_file),
         ],
-        input=passphrase.encode(),
+        input=passphrase,
         capture_output=True,
     )
     if result.returncode != 0:
         raise RuntimeError(f"GPG decryption failed: {result.stderr.decode()}")
 
-    secrets = {}
-    for line in result.stdout.decode().splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" in line:
-            key, value = line.split("=", 1)
-            secrets[key.strip()] = value.strip()
-    return secrets
+    return dict(_ENV_LINE_RE.findall(result.stdout.decode()))
 
 
 def get_hyperliquid_key(passphrase: str | None = None) -> str:
@@ -1,7 +1,7 @@
-"""Atomic JSON file operations with file locking."""
+"""Atomic JSON file operations (temp file + rename)."""
 
-import fcntl
 import json
+import os
 import tempfile
 from pathlib import Path
 
@@ -9,8 +9,11 @@ from pathlib import Path
 def atomic_write_json(filepath: Path, data: dict) -> None:
     """Write JSON data atomically using temp file + rename.
 
-    Uses fcntl.flock for advisory locking and writes to a temp file
-    first, then renames to prevent partial reads.
+    Writes to a private temp file in the same directory, fsyncs it, then
+    os.replace()s it over the target so readers see either the old or the
+    new file, never a partial one (and not an empty one after a crash).
+    No lock is taken on the temp file: nothing else can open it by name,
+    so an flock there would not exclude anyone.
 
     Args:
         filepath: Target JSON file path.
@@ -25,18 +28,20 @@ def atomic_write_json(filepath: Path, data: dict) -> None:
     )
     try:
         with open(fd, "w") as f:
-            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
             json.dump(data, f, indent=2, default=str)
             f.flush()
-            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-        Path(tmp_path).rename(filepath)
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
     except Exception:
         Path(tmp_path).unlink(missing_ok=True)
         raise
 
 
 def read_json(filepath: Path) -> dict:
-    """Read a JSON file with shared lock.
+    """Read a JSON file.
+
+    No lock is needed: writers only ever replace the file by rename (see
+    atomic_write_json), so a reader always opens one complete version.
 
     Args:
         filepath: JSON file to read.
@@ -49,7 +54,4 @@ def read_json(filepath: Path) -> dict:
     """
     filepath = Path(filepath)
     with open(filepath, "r") as f:
-        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-        data = json.load(f)
-        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-    return data
+        return json.load(f)
@@ -1,14 +1,97 @@
 """Logging setup for myClaw."""
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from pathlib import Path
+import threading
 
 from src.utils.config_loader import get_logs_dir
 
+# Records are enqueued by a QueueHandler on the caller thread and written to
+# stderr / logs/<name>.log by a single background QueueListener, so logging
+# calls on the trading path never block on terminal or disk I/O.
+# Several processes (cycle, daemon, scripts) may append to the same
+# logs/<name>.log, so files are never rotated in-process: rotate them
+# externally (e.g. logrotate) and WatchedFileHandler reopens the new file.
+
+_FORMATTER = logging.Formatter(
+    "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_listener: logging.handlers.QueueListener | None = None
+_listener_lock = threading.Lock()
+
+
+class _DispatchHandler(logging.Handler):
+    """Listener-side handler: console for every record, file per logger name."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._console = logging.StreamHandler(sys.stderr)
+        self._console.setFormatter(_FORMATTER)
+        self._files: dict[str, logging.Handler] = {}
+
+    def add(self, name: str) -> None:
+        if name not in self._files:
+            file_handler = logging.handlers.WatchedFileHandler(
+                get_logs_dir() / f"{name}.log"
+            )
+            file_handler.setFormatter(_FORMATTER)
+            self._files[name] = file_handler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._console.handle(record)
+        file_handler = self._files.get(record.name)
+        if file_handler is not None:
+            file_handler.handle(record)
+
+    def close(self) -> None:
+        for handler in self._files.values():
+            handler.close()
+        super().close()
+
+
+_dispatch = _DispatchHandler()
+
+
+def _ensure_listener() -> None:
+    """Start the background listener once per process."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        _listener = logging.handlers.QueueListener(_queue, _dispatch)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the listener (registered with atexit).
+
+    atexit only runs on a normal interpreter exit. A process killed by a
+    signal's default action (e.g. an unhandled SIGTERM) drops whatever is
+    still queued. Entrypoints that must keep those records install a
+    handler that lets the process exit normally, such as
+    src.utils.retry.install_shutdown_handler().
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        _dispatch.close()
+
 
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
-    """Set up a logger with file and console handlers.
+    """Set up a logger with file and console output.
+
+    The logger itself only gets a QueueHandler; the console and
+    ``logs/<name>.log`` writes happen on the listener thread.
 
     Args:
         name: Logger name (used as log filename).
@@ -22,20 +105,8 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
         return logger
 
     logger.setLevel(level)
-    formatter = logging.Formatter(
-        "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
-    # Console handler
-    console = logging.StreamHandler(sys.stderr)
-    console.setFormatter(formatter)
-    logger.addHandler(console)
-
-    # File handler
-    logs_dir = get_logs_dir()
-    file_handler = logging.FileHandler(logs_dir / f"{name}.log")
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    _dispatch.add(name)
+    _ensure_listener()
+    logger.addHandler(logging.handlers.QueueHandler(_queue))
 
     return logger
@@ -19,14 +19,53 @@
     )
 """
 
-import time
+import json
+import os
+import random
+import signal
+import threading
 import functools
+from datetime import datetime, timezone
 from typing import Any, Callable, Type
 
+from src.utils.config_loader import get_project_root
+from src.utils.file_lock import atomic_write_json, read_json
 from src.utils.logger import setup_logger
 
 logger = setup_logger("retry")
 
+# バックオフの揺らぎ (jitter) 方式。AWS "Exponential Backoff and Jitter" に準拠。
+#   none:         min(cap, base * factor**attempt)
+#   full:         uniform(0, min(cap, base * factor**attempt))
+#   equal:        上限の半分 + uniform(0, 上限の半分)
+#   decorrelated: min(cap, uniform(base, 前回待機 * 3))
+JITTER_MODES = ("none", "full", "equal", "decorrelated")
+
+# シャットダウン要求。リトライ待機はこの Event で待つため、set されると即座に中断する。
+_shutdown = threading.Event()
+
+
+def request_shutdown() -> None:
+    """進行中・以降のリトライ待機を中断させる (常駐プロセスの終了処理から呼ぶ)。"""
+    _shutdown.set()
+
+
+def install_shutdown_handler(signums: tuple[int, ...] = (signal.SIGTERM,)) -> None:
+    """シグナル受信時に request_shutdown() する (リトライを使うエントリポイントで呼ぶ)。
+
+    1回目のシグナルではリトライ待機だけを中断し (RetryAborted)、処理中のステップは
+    呼び出し側のフォールバックを経て通常終了させる (atexit のログ flush も走る)。
+    ハンドラは既定動作に戻すため、2回目のシグナルで従来どおり即終了する。
+    メインスレッドから呼ぶこと。
+    """
+    def handler(signum: int, frame: Any) -> None:
+        logger.warning("シグナル %d を受信: リトライ待機を中断して終了します", signum)
+        request_shutdown()
+        signal.signal(signum, signal.SIG_DFL)
+
+    for signum in signums:
+        signal.signal(signum, handler)
+
 
 class RetryExhausted(Exception):
     """リトライ上限に達した際に送出される例外。"""
@@ -40,6 +79,23 @@ class RetryExhausted(Exception):
         )
 
 
+class RetryAborted(RetryExhausted):
+    """シャットダウン要求によりリトライ待機が中断された際に送出される例外。
+
+    RetryExhausted のサブクラスなので、except RetryExhausted の呼び出し側は
+    リトライ上限超過と同じフォールバックで扱える。
+    """
+
+    def __init__(self, operation: str, attempts: int, last_error: Exception):
+        self.operation = operation
+        self.attempts = attempts
+        self.last_error = last_error
+        Exception.__init__(
+            self,
+            f"{operation}: シャットダウン要求によりリトライ中断 ({attempts}回試行)。最終エラー: {last_error}",
+        )
+
+
 def retry_with_backoff(
     fn: Callable | None = None,
     *,
@@ -48,7 +104,9 @@ def retry_with_backoff(
     backoff_factor: float = 2.0,
     max_delay: float = 30.0,
     exceptions: tuple[Type[Exception], ...] = (Exception,),
+    unrecoverable: tuple[Type[Exception], ...] = (),
     operation_name: str = "処理",
+    jitter: str = "full",
 ) -> Any:
     """指数バックオフ付きリトライでfnを実行する。
 
@@ -61,13 +119,20 @@ def retry_with_backoff(
         backoff_factor: 待機時間の倍率 (指数バックオフ)。
         max_delay: 最大待機秒数。
         exceptions: リトライ対象とする例外タプル。
+        unrecoverable: 回復不能とみなす例外タプル。exceptions に該当しても
+            待機・リトライせず即座にそのまま送出する (認証エラー等)。
         operation_name: ログ用の処理名。
+        jitter: 待機時間の揺らぎ方式 ("none" | "full" | "equal" | "decorrelated")。
+            同一障害で複数エージェントが同時にリトライするのを分散させる。
 
     Returns:
         fnの戻り値。
 
     Raises:
         RetryExhausted: max_retries回リトライしても成功しなかった場合。
+        RetryAborted: リトライ待機中に request_shutdown() された場合
+            (RetryExhausted のサブクラス)。
+        unrecoverable に該当する例外: 初回発生時にそのまま送出。
     """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -79,7 +144,9 @@ def retry_with_backoff(
                 backoff_factor=backoff_factor,
                 max_delay=max_delay,
                 exceptions=exceptions,
+                unrecoverable=unrecoverable,
                 operation_name=operation_name,
+                jitter=jitter,
             )
         return wrapper
 
@@ -100,11 +167,18 @@ def _execute_with_retry(
     backoff_factor: float,
     max_delay: float,
     exceptions: tuple[Type[Exception], ...],
+    unrecoverable: tuple[Type[Exception], ...],
     operation_name: str,
+    jitter: str,
 ) -> Any:
     """実際のリトライ実行ロジック。"""
+    if jitter not in JITTER_MODES:
+        raise ValueError(f"jitter は {JITTER_MODES} のいずれか: {jitter!r}")
     last_error: Exception | None = None
     delay = base_delay
+    prev_delay = base_delay
+    # プロセス間で乱数状態が揃わないよう呼び出しごとに OS 乱数でシードする
+    rng = random.Random(os.urandom(8)) if jitter != "none" else None
 
     for attempt in range(max_retries + 1):
         try:
@@ -115,6 +189,11 @@ def _execute_with_retry(
                 )
             return result
         except exceptions as e:
+            if unrecoverable and isinstance(e, unrecoverable):
+                logger.error(
+                    "%s: 回復不能エラーのためリトライしない: %s", operation_name, e,
+                )
+                raise
             last_error = e
             remaining = max_retries - attempt
             if remaining <= 0:
@@ -124,12 +203,23 @@ def _execute_with_retry(
                 )
                 raise RetryExhausted(operation_name, max_retries + 1, e) from e
 
-            actual_delay = min(delay, max_delay)
+            capped = min(delay, max_delay)
+            if rng is None:
+                actual_delay = capped
+            elif jitter == "full":
+                actual_delay = rng.uniform(0, capped)
+            elif jitter == "equal":
+                actual_delay = capped / 2 + rng.uniform(0, capped / 2)
+            else:  # decorrelated
+                actual_delay = min(max_delay, rng.uniform(base_delay, prev_delay * 3))
+            prev_delay = actual_delay
             logger.warning(
-                "%s: 試行%d失敗 (%s)。%d秒後にリトライ (残り%d回)...",
-                operation_name, attempt + 1, e, int(actual_delay), remaining,
+                "%s: 試行%d失敗 (%s)。%.1f秒後にリトライ (残り%d回)...",
+                operation_name, attempt + 1, e, actual_delay, remaining,
             )
-            time.sleep(actual_delay)
+            if _shutdown.wait(actual_delay):
+                logger.warning("%s: シャットダウン要求によりリトライを中断", operation_name)
+                raise RetryAborted(operation_name, attempt + 1, e) from e
             delay *= backoff_factor
 
     # ここには到達しないが型チェック用
@@ -147,7 +237,9 @@ def call_with_retry(
     backoff_factor: float = 2.0,
     max_delay: float = 30.0,
     exceptions: tuple[Type[Exception], ...] = (Exception,),
+    unrecoverable: tuple[Type[Exception], ...] = (),
     operation_name: str = "処理",
+    jitter: str = "full",
 ) -> Any:
     """fnをリトライ付きで呼び出す (デコレータを使わない場合の代替API)。
 
@@ -160,13 +252,20 @@ def call_with_retry(
         backoff_factor: 待機時間の倍率。
         max_delay: 最大待機秒数。
         exceptions: リトライ対象とする例外タプル。
+        unrecoverable: 回復不能とみなす例外タプル。exceptions に該当しても
+            待機・リトライせず即座にそのまま送出する (認証エラー等)。
         operation_name: ログ用の処理名。
+        jitter: 待機時間の揺らぎ方式 ("none" | "full" | "equal" | "decorrelated")。
+            同一障害で複数エージェントが同時にリトライするのを分散させる。
 
     Returns:
         fnの戻り値。
 
     Raises:
         RetryExhausted: max_retries回リトライしても成功しなかった場合。
+        RetryAborted: リトライ待機中に request_shutdown() された場合
+            (RetryExhausted のサブクラス)。
+        unrecoverable に該当する例外: 初回発生時にそのまま送出。
     """
     return _execute_with_retry(
         fn, args, kwargs or {},
@@ -175,7 +274,9 @@ def call_with_retry(
         backoff_factor=backoff_factor,
         max_delay=max_delay,
         exceptions=exceptions,
+        unrecoverable=unrecoverable,
         operation_name=operation_name,
+        jitter=jitter,
     )
 
 
@@ -189,13 +290,9 @@ def enter_safe_hold(reason: str, notify: bool = True) -> None:
         reason: 安全移行の理由 (ログ・通知に使用)。
         notify: Telegram通知を行うか。
     """
-    import json
-    from pathlib import Path
-    from datetime import datetime, timezone
-    from src.utils.config_loader import get_project_root
-
     ROOT = get_project_root()
     logger.critical("SAFE_HOLD: %s", reason)
+    now_iso = datetime.now(timezone.utc).isoformat()
 
     # signals.json を hold で上書き
     signals_path = ROOT / "signals" / "signals.json"
@@ -209,7 +306,7 @@ def enter_safe_hold(reason: str, notify: bool = True) -> None:
             "orient": "安全状態に移行",
             "decide": f"hold (reason: {reason})",
         },
-        "safe_hold_at": datetime.now(timezone.utc).isoformat(),
+        "safe_hold_at": now_iso,
         "safe_hold_reason": reason,
     }
     try:
@@ -222,22 +319,27 @@ def enter_safe_hold(reason: str, notify: bool = True) -> None:
         logger.error("SAFE_HOLD: signals.json の書き込みに失敗: %s", e)
 
     # kill_switch.json に warning フラグを立てる
+    # (brain / kill_switch と同じく read_json + atomic_write_json で読み書きする)
     ks_path = ROOT / "state" / "kill_switch.json"
     try:
-        if ks_path.exists():
-            ks = json.loads(ks_path.read_text(encoding="utf-8"))
+        # 壊れた JSON は {} で上書きせず、下の except でログのみ残す
+        # (既存の kill 状態を消さないため)
+        try:
+            ks = read_json(ks_path)
             if not isinstance(ks, dict):
                 ks = {}
-        else:
+        except FileNotFoundError:
             ks = {}
-        ks["warning"] = True
-        ks["warning_reason"] = f"safe_hold: {reason}"
-        ks["warning_at"] = datetime.now(timezone.utc).isoformat()
-        ks_path.parent.mkdir(parents=True, exist_ok=True)
-        ks_path.write_text(
-            json.dumps(ks, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        logger.info("SAFE_HOLD: kill_switch.json に warning フラグを設定しました")
+        warning_reason = f"safe_hold: {reason}"
+        if ks.get("warning") is True and ks.get("warning_reason") == warning_reason:
+            # 同一理由で既に warning 済み → 書き込み不要 (warning_at は初回時刻を保持)
+            logger.info("SAFE_HOLD: kill_switch.json は同一理由で warning 済み")
+        else:
+            ks["warning"] = True
+            ks["warning_reason"] = warning_reason
+            ks["warning_at"] = now_iso
+            atomic_write_json(ks_path, ks)
+            logger.info("SAFE_HOLD: kill_switch.json に warning フラグを設定しました")
     except Exception as e:
         logger.error("SAFE_HOLD: kill_switch.json の更新に失敗: %s", e)
 
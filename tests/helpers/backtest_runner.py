@@ -26,9 +26,17 @@ def run_backtest(
     """
     trades = []
     i = window
+    # 毎足の再構築を避け、初回のみ構築して以降は append で1本ずつ追加。
+    # max_len で直近 window+2 本に保ち、scan は毎回 cache=None で呼ぶため
+    # 毎足 chunk から再構築した場合と同じシグナルになる
+    # (test_strategy.py の TestBacktestRunner で確認)。
+    max_len = window + 2  # +2 for scan_idx = len-2
+    strategy = strategy_class(candles[:i + 2], config)
+    fed = i + 2
     while i < len(candles) - 1:
-        chunk = candles[max(0, i - window):i + 2]  # +2 for scan_idx = len-2
-        strategy = strategy_class(chunk, config)
+        while fed < i + 2:
+            strategy.append(candles[fed], max_len=max_len)
+            fed += 1
         result = strategy.scan(cache=None)
 
         # scan() returns tuple (signal, cache) or just signal
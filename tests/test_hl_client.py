@@ -1,7 +1,7 @@
 """Tests for HLClient API wrapper."""
 
 import pytest
-from unittest.mock import MagicMock, patch, PropertyMock
+from unittest.mock import MagicMock, patch, PropertyMock, create_autospec
 
 
 # ---------------------------------------------------------------------------
@@ -27,10 +27,16 @@ def _make_client(read_only=True):
 
 
 def _make_trading_client():
-    """Create HLClient with Exchange mocked for trading tests."""
-    mock_account = MagicMock()
+    """Create HLClient with Exchange mocked for trading tests.
+
+    Exchange and the account are autospecced so SDK API drift fails here.
+    """
+    from eth_account.signers.local import LocalAccount
+    from hyperliquid.exchange import Exchange
+
+    mock_account = create_autospec(LocalAccount, instance=True)
     mock_account.address = "0xMOCK_ADDRESS"
-    mock_exchange = MagicMock()
+    mock_exchange = create_autospec(Exchange)
 
     with patch("src.api.hl_client.Info") as MockInfo, \
          patch("src.api.hl_client.get_hyperliquid_url", return_value="https://test"), \
@@ -254,8 +260,8 @@ class TestPlaceMarketOrder:
     def test_filled(self):
         """Successful order → status=filled, fill_price extracted."""
         client = _make_trading_client()
-        client.exchange.update_leverage = MagicMock(return_value={"status": "ok"})
-        client.exchange.market_open = MagicMock(return_value=FILLED_RESPONSE)
+        client.exchange.update_leverage.return_value = {"status": "ok"}
+        client.exchange.market_open.return_value = FILLED_RESPONSE
 
         result = client.place_market_order("BTC", "long", 0.01, 3)
         assert result["success"] is True
@@ -266,7 +272,7 @@ class TestPlaceMarketOrder:
     def test_leverage_fails(self):
         """Leverage error → market_open not called."""
         client = _make_trading_client()
-        client.exchange.update_leverage = MagicMock(return_value={"status": "err", "msg": "bad"})
+        client.exchange.update_leverage.return_value = {"status": "err", "msg": "bad"}
 
         result = client.place_market_order("BTC", "long", 0.01, 3)
         assert result["success"] is False
@@ -276,8 +282,8 @@ class TestPlaceMarketOrder:
     def test_partial(self):
         """Resting order → status=partial."""
         client = _make_trading_client()
-        client.exchange.update_leverage = MagicMock(return_value={"status": "ok"})
-        client.exchange.market_open = MagicMock(return_value=PARTIAL_RESPONSE)
+        client.exchange.update_leverage.return_value = {"status": "ok"}
+        client.exchange.market_open.return_value = PARTIAL_RESPONSE
 
         result = client.place_market_order("BTC", "long", 0.01, 3)
         assert result["status"] == "partial"
@@ -287,7 +293,7 @@ class TestClosePosition:
     def test_success(self):
         """Successful close → status=closed."""
         client = _make_trading_client()
-        client.exchange.market_close = MagicMock(return_value=FILLED_RESPONSE)
+        client.exchange.market_close.return_value = FILLED_RESPONSE
 
         result = client.close_position("BTC")
         assert result["success"] is True
@@ -296,7 +302,7 @@ class TestClosePosition:
     def test_none_response(self):
         """SDK returns None → status=no_position."""
         client = _make_trading_client()
-        client.exchange.market_close = MagicMock(return_value=None)
+        client.exchange.market_close.return_value = None
 
         result = client.close_position("BTC")
         assert result["status"] == "no_position"
@@ -306,7 +312,7 @@ class TestCancelOrder:
     def test_positional_args(self):
         """cancel(coin, oid) called with positional args."""
         client = _make_trading_client()
-        client.exchange.cancel = MagicMock(return_value={"status": "ok"})
+        client.exchange.cancel.return_value = {"status": "ok"}
 
         result = client.cancel_order("BTC", 12345)
         client.exchange.cancel.assert_called_once_with("BTC", 12345)
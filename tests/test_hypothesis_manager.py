@@ -0,0 +1,72 @@
+"""Tests for hypothesis/manager.py CRUD.
+
+state/hypotheses.json は tmp_path に隔離。
+"""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+import src.hypothesis.manager as m
+
+
+def _record(i: int) -> dict:
+    return {
+        "description": f"test hypothesis {i}",
+        "trigger": {"conditions": [{"symbol": "BTC", "feature": "rsi", "op": ">", "value": 70}]},
+        "prediction": {"symbol": "BTC", "direction": "short"},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    """hypotheses.json を tmp_path に置き、書き込み回数を数える。"""
+    settings = {"hypothesis": {"max_hypotheses": 3}}
+    with patch.object(m, "get_state_dir", return_value=tmp_path), \
+         patch.object(m, "load_settings", return_value=settings), \
+         patch.object(m, "atomic_write_json", wraps=m.atomic_write_json) as write:
+        yield tmp_path / "hypotheses.json", write
+
+
+class TestCreateHypothesesBulk:
+    def test_single_write(self, store):
+        """N 件登録してもファイル書き込みは1回。"""
+        path, write = store
+        created = m.create_hypotheses_bulk([_record(i) for i in range(3)], source="test")
+        assert write.call_count == 1
+        saved = json.loads(path.read_text())
+        assert [h["id"] for h in saved] == [h["id"] for h in created]
+        assert all(h["source"] == "test" for h in saved)
+
+    def test_unique_ids(self, store):
+        """同一バッチ内でも既存分に続けて ID が重複しない。"""
+        m.create_hypothesis(**_record(0))
+        created = m.create_hypotheses_bulk([_record(i) for i in (1, 2)])
+        ids = [h["id"] for h in m._load_all()]
+        assert len(set(ids)) == 3
+        assert [h["id"] for h in created] == ids[1:]
+        assert [h["id"][-3:] for h in m._load_all()] == ["001", "002", "003"]
+
+    def test_limit_rejects_with_empty_dict(self, store):
+        """上限超過分は {} で、入力と同じ長さ・順序を保つ。"""
+        path, write = store
+        created = m.create_hypotheses_bulk([_record(i) for i in range(5)])
+        assert [bool(h) for h in created] == [True, True, True, False, False]
+        assert len(json.loads(path.read_text())) == 3
+
+        # 全件弾かれたら書き込まない
+        assert m.create_hypotheses_bulk([_record(9)]) == [{}]
+        assert write.call_count == 1
+
+    def test_create_hypothesis_same_shape(self, store):
+        """create_hypothesis は bulk と同じ形のレコードを返す。"""
+        single = m.create_hypothesis(source="solo", **_record(0))
+        bulk = m.create_hypotheses_bulk([_record(1)], source="solo")[0]
+        assert single.keys() == bulk.keys()
+        assert single["status"] == "raw"
+        assert single["source"] == "solo"
+        assert single["shadow"] == bulk["shadow"]
+        assert m._load_all()[0] == single
@@ -7,10 +7,11 @@ from __future__ import annotations
 
 import pytest
 
-from src.strategy.base import BaseStrategy
+from src.strategy.base import BaseStrategy, CandleView
 from src.strategy.btc_rubber_wall import BtcRubberWall
 from src.strategy.eth_rubber_band import EthRubberBand
 from src.strategy.sol_rubber_wall import SolRubberWall
+from tests.helpers.backtest_runner import _simulate_forward, _summarize, run_backtest
 from tests.helpers.candle_factory import (
     inject_spike,
     make_candles,
@@ -324,6 +325,27 @@ class TestVolRatioCalculation:
         assert BaseStrategy._range_position(110.0, 90.0, 110.0) == pytest.approx(100.0)
         assert BaseStrategy._range_position(85.0, 90.0, 110.0) == pytest.approx(-25.0)
 
+    def test_match_zone(self):
+        """二分探索のゾーン判定が先勝ち線形走査と一致。重複時は線形走査。"""
+        zones = BtcRubberWall([]).cfg["zones"]
+        table = BaseStrategy._compile_zones(zones)
+        for pos in (-25.0, -20.0, -0.1, 0.0, 19.9, 20.0, 39.9, 40.0, 500.0, 999.0):
+            assert BaseStrategy._match_zone(pos, zones, table) == BaseStrategy._match_zone(pos, zones, None)
+        assert BaseStrategy._match_zone(10.0, zones, table)[0] == "bottom"
+
+        overlapping = {"a": {"range": [0, 50]}, "b": {"range": [20, 60]}}
+        assert BaseStrategy._compile_zones(overlapping) is None
+
+    def test_ema_last(self):
+        """_ema_last: 旧インライン EMA (スライス走査) と一致。"""
+        prices = [100.0 + (i % 7) * 0.3 - i * 0.01 for i in range(40)]
+        k = 2.0 / (9 + 1)
+        e = prices[0]
+        for p in prices[1:]:
+            e = p * k + e * (1 - k)
+        assert BaseStrategy._ema_last(prices, 9) == e
+        assert BaseStrategy._ema_last([5.0], 21) == 5.0
+
     def test_confidence_to_leverage(self):
         """CAPS: confidence mapping to leverage."""
         assert BaseStrategy.confidence_to_leverage(0.85) == 3
@@ -334,6 +356,165 @@ class TestVolRatioCalculation:
         assert BaseStrategy.confidence_to_leverage(0.50) == 1
 
 
+class TestIncrementalAppend:
+    def test_append_matches_rebuild(self):
+        """append(max_len) 後の状態・scan結果が再構築と一致。"""
+        candles = _make_spike_candles(vol_multiplier=6.0, range_position_target=80.0)
+        strategy = BtcRubberWall(candles[:250])
+        for c in candles[250:]:
+            strategy.append(c, max_len=200)
+
+        rebuilt = BtcRubberWall(candles[-200:])
+        assert strategy.candles == rebuilt.candles
+        assert strategy._vol_ratio_single(198) == pytest.approx(rebuilt._vol_ratio_single(198))
+        sig, next_cache = strategy.scan()
+        sig_rebuilt, next_cache_rebuilt = rebuilt.scan()
+        assert sig == sig_rebuilt
+        assert next_cache == pytest.approx(next_cache_rebuilt)
+
+    def test_from_state(self):
+        """from_state で再計算なしに同じ状態を復元。"""
+        candles = make_candles(n=300, base_price=2700.0, seed=7)
+        original = EthRubberBand(candles)
+        restored = EthRubberBand.from_state(original.export_state())
+        assert restored.candles == original.candles
+        assert restored.cfg == original.cfg
+        assert restored.scan() == original.scan()
+
+    def test_from_state_isolated(self):
+        """復元先への append は復元元の足データ・scan 結果に影響しない。"""
+        candles = _make_spike_candles(vol_multiplier=8.0, range_position_target=-15.0)
+        original = BtcRubberWall(candles[:-1])
+        expected_range = original._h4_range(len(candles) - 3)
+        restored = BtcRubberWall.from_state(original.export_state())
+        restored.append(candles[-1], max_len=len(candles) - 1)
+        assert original.candles == BtcRubberWall(candles[:-1]).candles
+        assert original._h4_range(len(candles) - 3) == expected_range
+        assert original.scan() == BtcRubberWall(candles[:-1]).scan()
+
+    def test_rescan_same_bar_skipped(self):
+        """確定足が進まない再 scan はシグナルを再発行せず前回の next_cache を返す。"""
+        candles = _make_spike_candles(vol_multiplier=8.0, range_position_target=-15.0)
+        strategy = BtcRubberWall(candles[:-1])
+        strategy.append(candles[-1])
+        sig, cache = strategy.scan()
+        assert sig is not None
+
+        sig2, cache2 = strategy.scan(cache)
+        assert sig2 is None
+        assert cache2 is cache
+
+    def test_append_without_timestamps(self):
+        """t 欠損 (t=0) の足を append しても新しい確定足として再 scan される。"""
+        candles = _make_spike_candles(vol_multiplier=8.0, range_position_target=-15.0)
+        for c in candles:
+            del c["t"]
+        strategy = BtcRubberWall(candles[:-1])
+        strategy.scan()
+        strategy.append(candles[-1])
+        sig, _ = strategy.scan()
+        assert sig is not None
+        assert sig == BtcRubberWall(candles).scan()[0]
+
+    def test_h4_range_recomputed_after_append(self):
+        """append(max_len) で窓がずれた後は _h4_range を再計算する (t 欠損でも)。"""
+        candles = make_candles(n=300, base_price=97000.0, seed=5)
+        for c in candles:
+            del c["t"]
+        strategy = BtcRubberWall(candles[:200])
+        before = strategy._h4_range(198)
+        for c in candles[200:]:
+            strategy.append(c, max_len=200)
+        after = strategy._h4_range(198)
+        assert after == BtcRubberWall(candles[-200:])._h4_range(198)
+        assert after != before
+
+    def test_shared_candle_view(self):
+        """CandleView を共有した戦略は個別構築と同じ結果、append も共有される。"""
+        candles = make_candles(n=300, base_price=2700.0, seed=11)
+        view = CandleView(candles[:-1])
+        btc = BtcRubberWall(view)
+        eth = EthRubberBand(view)
+        view.append(candles[-1])
+        assert len(btc.candles) == len(eth.candles) == 300
+        assert btc.scan() == BtcRubberWall(candles).scan()
+        assert eth.scan() == EthRubberBand(candles).scan()
+
+
+class TestBacktestRunner:
+    @staticmethod
+    def _regime_candles(base_price: float, seed: int) -> list[dict]:
+        """低ボラ区間と通常区間を交互に置き、BEAR スパイクを散らした足列。"""
+        n = 1000
+        candles = make_candles(n=n, base_price=base_price, seed=seed)
+        for k in range(n):
+            if (k // 150) % 2:
+                c = candles[k]
+                o = c["o"]
+                c["c"] = o + (c["c"] - o) * 0.3
+                c["h"] = max(o + (c["h"] - o) * 0.3, o, c["c"])
+                c["l"] = min(o - (o - c["l"]) * 0.3, o, c["c"])
+        for k in range(320, n - 2, 23):
+            inject_spike(candles, k, vol_multiplier=3.0 + (k % 7) * 0.5)
+        return candles
+
+    @staticmethod
+    def _run_rebuild(strategy_class, candles: list[dict], window: int = 300) -> dict:
+        """毎足 chunk から再構築する従来のバックテスト (run_backtest の比較基準)。"""
+        trades = []
+        i = window
+        while i < len(candles) - 1:
+            sig, _ = strategy_class(candles[max(0, i - window):i + 2]).scan(cache=None)
+            if sig is None:
+                i += 1
+                continue
+            direction = sig["action"]
+            outcome = _simulate_forward(
+                candles, i, sig["entry_price"], sig["take_profit"], sig["stop_loss"],
+                direction, sig.get("exit_bars", 50),
+            )
+            trades.append({
+                "bar": i,
+                "direction": direction,
+                "entry": sig["entry_price"],
+                "tp": sig["take_profit"],
+                "sl": sig["stop_loss"],
+                **outcome,
+            })
+            i += max(1, outcome.get("bars_held", 1))
+        return _summarize(trades)
+
+    @pytest.mark.parametrize("strategy_class,base_price", [
+        (BtcRubberWall, 97000.0),
+        (EthRubberBand, 2700.0),
+        (SolRubberWall, 160.0),
+    ])
+    def test_matches_rebuild_per_bar(self, strategy_class, base_price):
+        """append で進める run_backtest が毎足再構築と同じトレードを出す (VAS low_vol 含む)。"""
+        candles = self._regime_candles(base_price, seed=1)
+        result = run_backtest(strategy_class, candles, window=300)
+        assert result["total"] > 0
+        assert result == self._run_rebuild(strategy_class, candles, window=300)
+
+class TestCacheSumKnown:
+    def test_fast_path_uses_cached_sum(self):
+        """next_cache の sum_known から Fast path の出来高比率を再集計なしで算出。"""
+        candles = _make_spike_candles(vol_multiplier=6.0, range_position_target=80.0)
+        _, cache = BtcRubberWall(candles[:-1]).scan()
+        assert cache["n_known"] == 288 - 1
+
+        strategy = BtcRubberWall(candles)
+        idx = len(candles) - 2
+        assert strategy._vol_ratio_from_cache(cache, idx, 288) == pytest.approx(
+            strategy._vol_ratio_single(idx)
+        )
+        # 旧形式キャッシュ (sum_known なし) でも同じ値
+        legacy = {"next_target_t": cache["next_target_t"], "threshold_vol": cache["threshold_vol"]}
+        assert strategy._vol_ratio_from_cache(legacy, idx, 288) == pytest.approx(
+            strategy._vol_ratio_single(idx)
+        )
+
+
 class TestSignalFormat:
     """All strategies should produce signals with required fields."""
 
@@ -0,0 +1,346 @@
+"""Tests for src/utils helpers.
+
+ファイル I/O は tmp_path に隔離。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+# ---------------------------------------------------------------------------
+#  logger
+# ---------------------------------------------------------------------------
+
+class TestLogger:
+    def test_record_reaches_named_file(self, tmp_path):
+        """QueueHandler → QueueListener 経由で logs/<name>.log に書かれる。"""
+        from src.utils import logger as logger_mod
+
+        name = f"test_logger_{uuid.uuid4().hex[:8]}"
+        with patch.object(logger_mod, "get_logs_dir", return_value=tmp_path):
+            log = logger_mod.setup_logger(name)
+        try:
+            assert isinstance(log.handlers[0], logging.handlers.QueueHandler)
+            log.info("hello %s", "queue")
+
+            log_file = tmp_path / f"{name}.log"
+            deadline = time.monotonic() + 5.0
+            while time.monotonic() < deadline:
+                if log_file.exists() and "hello queue" in log_file.read_text():
+                    break
+                time.sleep(0.01)
+            text = log_file.read_text()
+            assert f"[INFO] {name}: hello queue" in text
+        finally:
+            log.handlers.clear()
+            logger_mod._dispatch._files.pop(name).close()
+
+
+# ---------------------------------------------------------------------------
+#  retry
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def retry_mod():
+    """src.utils.retry (シャットダウン要求をテスト前後でリセット)。"""
+    from src.utils import retry
+
+    retry._shutdown.clear()
+    yield retry
+    retry._shutdown.clear()
+
+
+def _record_delays(retry_mod, jitter: str, *, seed: bytes = b"\x00" * 8) -> list[float]:
+    """常に失敗する fn を max_retries=5 で実行し、各リトライの待機秒数を返す。"""
+    fn = MagicMock(side_effect=OSError("boom"))
+    with patch.object(retry_mod, "_shutdown") as shutdown, \
+         patch.object(retry_mod.os, "urandom", return_value=seed):
+        shutdown.wait.return_value = False
+        with pytest.raises(retry_mod.RetryExhausted):
+            retry_mod.call_with_retry(
+                fn, max_retries=5, base_delay=2.0, backoff_factor=2.0,
+                max_delay=20.0, jitter=jitter,
+            )
+    assert fn.call_count == 6
+    return [c.args[0] for c in shutdown.wait.call_args_list]
+
+
+class TestRetryJitter:
+    def test_none(self, retry_mod):
+        """none: base * factor**attempt を max_delay で頭打ち。"""
+        assert _record_delays(retry_mod, "none") == [2.0, 4.0, 8.0, 16.0, 20.0]
+
+    def test_full(self, retry_mod):
+        """full: 0 ≤ 待機 ≤ 上限。"""
+        caps = [2.0, 4.0, 8.0, 16.0, 20.0]
+        delays = _record_delays(retry_mod, "full")
+        assert all(0.0 <= d <= cap for d, cap in zip(delays, caps))
+        assert delays == _record_delays(retry_mod, "full")
+
+    def test_equal(self, retry_mod):
+        """equal: 上限/2 ≤ 待機 ≤ 上限。"""
+        caps = [2.0, 4.0, 8.0, 16.0, 20.0]
+        delays = _record_delays(retry_mod, "equal")
+        assert all(cap / 2 <= d <= cap for d, cap in zip(delays, caps))
+
+    def test_decorrelated(self, retry_mod):
+        """decorrelated: base ≤ 待機 ≤ min(max_delay, 前回待機 * 3)。"""
+        delays = _record_delays(retry_mod, "decorrelated")
+        prev = 2.0
+        for d in delays:
+            assert 2.0 <= d <= min(20.0, prev * 3)
+            prev = d
+
+    def test_seed_varies_delays(self, retry_mod):
+        """OS 乱数のシードが違えば待機時間も変わる (プロセス間で揃わない)。"""
+        a = _record_delays(retry_mod, "full", seed=b"\x00" * 8)
+        b = _record_delays(retry_mod, "full", seed=b"\x01" * 8)
+        assert a != b
+
+    def test_unknown_mode(self, retry_mod):
+        """未知の jitter は fn を呼ぶ前に ValueError。"""
+        fn = MagicMock()
+        with pytest.raises(ValueError, match="jitter"):
+            retry_mod.call_with_retry(fn, jitter="bogus")
+        fn.assert_not_called()
+
+
+class TestRetryUnrecoverable:
+    def test_reraised_without_sleep(self, retry_mod):
+        """unrecoverable に該当する例外は待機せず初回でそのまま送出。"""
+        fn = MagicMock(side_effect=PermissionError("auth"))
+        with patch.object(retry_mod, "_shutdown") as shutdown:
+            with pytest.raises(PermissionError, match="auth"):
+                retry_mod.call_with_retry(
+                    fn, max_retries=3, exceptions=(Exception,),
+                    unrecoverable=(PermissionError,),
+                )
+        fn.assert_called_once()
+        shutdown.wait.assert_not_called()
+
+    def test_other_errors_still_retried(self, retry_mod):
+        """unrecoverable 以外は従来どおりリトライする。"""
+        fn = MagicMock(side_effect=[OSError("flaky"), "ok"])
+        with patch.object(retry_mod, "_shutdown") as shutdown:
+            shutdown.wait.return_value = False
+            result = retry_mod.call_with_retry(
+                fn, max_retries=3, unrecoverable=(PermissionError,),
+            )
+        assert result == "ok"
+        assert fn.call_count == 2
+        shutdown.wait.assert_called_once()
+
+
+class TestRetryShutdown:
+    def test_shutdown_during_wait_aborts(self, retry_mod):
+        """待機中に request_shutdown() → 待機を打ち切り RetryAborted。"""
+        fn = MagicMock(side_effect=OSError("down"))
+        timer = threading.Timer(0.05, retry_mod.request_shutdown)
+        timer.start()
+        started = time.monotonic()
+        try:
+            with pytest.raises(retry_mod.RetryAborted) as exc_info:
+                retry_mod.call_with_retry(
+                    fn, max_retries=3, base_delay=30.0, jitter="none",
+                )
+        finally:
+            timer.cancel()
+        assert time.monotonic() - started < 5.0
+        assert fn.call_count == 1
+        assert exc_info.value.attempts == 1
+        assert isinstance(exc_info.value.last_error, OSError)
+
+    def test_aborted_is_retry_exhausted(self, retry_mod):
+        """RetryAborted は except RetryExhausted の呼び出し側でも捕捉できる。"""
+        retry_mod.request_shutdown()
+        fn = MagicMock(side_effect=OSError("down"))
+        with pytest.raises(retry_mod.RetryExhausted) as exc_info:
+            retry_mod.call_with_retry(fn, max_retries=3, jitter="none")
+        assert type(exc_info.value) is retry_mod.RetryAborted
+        fn.assert_called_once()
+
+    def test_signal_handler_requests_shutdown(self, retry_mod):
+        """install_shutdown_handler: 1回目のシグナルで request_shutdown、以降は既定動作。"""
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            retry_mod.install_shutdown_handler((signal.SIGUSR1,))
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert retry_mod._shutdown.is_set()
+            assert signal.getsignal(signal.SIGUSR1) == signal.SIG_DFL
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+
+
+class TestSafeHoldKillSwitch:
+    def test_warning_added_to_existing_state(self, retry_mod, tmp_path):
+        """既存の kill_switch.json に warning フラグを追記 (他キーは保持)。"""
+        ks_path = tmp_path / "state" / "kill_switch.json"
+        ks_path.parent.mkdir()
+        ks_path.write_text(json.dumps({"enabled": True}))
+        with patch.object(retry_mod, "get_project_root", return_value=tmp_path):
+            retry_mod.enter_safe_hold("test", notify=False)
+        ks = json.loads(ks_path.read_text())
+        assert ks["enabled"] is True
+        assert ks["warning"] is True
+        assert ks["warning_reason"] == "safe_hold: test"
+
+    def test_missing_file_created(self, retry_mod, tmp_path):
+        """kill_switch.json が無ければ warning のみで新規作成。"""
+        with patch.object(retry_mod, "get_project_root", return_value=tmp_path):
+            retry_mod.enter_safe_hold("test", notify=False)
+        ks = json.loads((tmp_path / "state" / "kill_switch.json").read_text())
+        assert ks["warning"] is True
+
+    def test_corrupt_file_not_overwritten(self, retry_mod, tmp_path):
+        """壊れた kill_switch.json は {} で上書きせずそのまま残す。"""
+        ks_path = tmp_path / "state" / "kill_switch.json"
+        ks_path.parent.mkdir()
+        ks_path.write_text('{"enabled": true,')
+        with patch.object(retry_mod, "get_project_root", return_value=tmp_path):
+            retry_mod.enter_safe_hold("test", notify=False)
+        assert ks_path.read_text() == '{"enabled": true,'
+        # signals.json の hold 書き込みは行われる
+        signals = json.loads((tmp_path / "signals" / "signals.json").read_text())
+        assert signals["action_type"] == "hold"
+
+
+# ---------------------------------------------------------------------------
+#  crypto
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def crypto_env(tmp_path):
+    """secrets.env.gpg を tmp_path に置き、gpg (subprocess.run) と時計をモック。"""
+    from src.utils import crypto
+
+    gpg_file = tmp_path / "config" / "secrets.env.gpg"
+    gpg_file.parent.mkdir()
+    gpg_file.write_bytes(b"encrypted")
+    clock = [1000.0]
+    completed = subprocess.CompletedProcess(
+        args=[], returncode=0,
+        stdout=b"HYPERLIQUID_PRIVATE_KEY=0xabc\nOTHER=1\n", stderr=b"",
+    )
+    crypto.clear_secrets_cache()
+    with patch.object(crypto, "get_project_root", return_value=tmp_path), \
+         patch.object(crypto, "_CACHE_TTL", 300.0), \
+         patch.object(crypto.time, "monotonic", side_effect=lambda: clock[0]), \
+         patch.object(crypto.subprocess, "run", return_value=completed) as run:
+        yield crypto, run, clock, gpg_file
+    crypto.clear_secrets_cache()
+
+
+class TestSecretsCache:
+    def test_cached_within_ttl(self, crypto_env):
+        """TTL 内の再呼び出しは gpg を起動しない (get_hyperliquid_key 経由も)。"""
+        crypto, run, clock, _ = crypto_env
+        assert crypto.decrypt_secrets("pw") == {"HYPERLIQUID_PRIVATE_KEY": "0xabc", "OTHER": "1"}
+        clock[0] += 299.0
+        assert crypto.get_hyperliquid_key("pw") == "0xabc"
+        assert run.call_count == 1
+
+    def test_ttl_expiry(self, crypto_env):
+        """TTL を過ぎたら再復号。"""
+        crypto, run, clock, _ = crypto_env
+        crypto.decrypt_secrets("pw")
+        clock[0] += 300.0
+        crypto.decrypt_secrets("pw")
+        assert run.call_count == 2
+
+    def test_passphrase_change(self, crypto_env):
+        """パスフレーズが変わったら再復号。"""
+        crypto, run, _, _ = crypto_env
+        crypto.decrypt_secrets("pw")
+        crypto.decrypt_secrets("other")
+        assert run.call_count == 2
+        assert run.call_args.kwargs["input"] == b"other"
+
+    def test_mtime_change(self, crypto_env):
+        """.gpg ファイルの mtime が変わったら再復号。"""
+        crypto, run, _, gpg_file = crypto_env
+        crypto.decrypt_secrets("pw")
+        st = gpg_file.stat()
+        os.utime(gpg_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        crypto.decrypt_secrets("pw")
+        assert run.call_count == 2
+
+    def test_clear_secrets_cache(self, crypto_env):
+        """clear_secrets_cache() 後は再復号。"""
+        crypto, run, _, _ = crypto_env
+        crypto.decrypt_secrets("pw")
+        crypto.clear_secrets_cache()
+        crypto.decrypt_secrets("pw")
+        assert run.call_count == 2
+
+    def test_returned_dict_is_a_copy(self, crypto_env):
+        """戻り値を書き換えてもキャッシュには影響しない。"""
+        crypto, _, _, _ = crypto_env
+        crypto.decrypt_secrets("pw")["HYPERLIQUID_PRIVATE_KEY"] = "tampered"
+        assert crypto.get_hyperliquid_key("pw") == "0xabc"
+
+
+# ---------------------------------------------------------------------------
+#  config_loader
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def yaml_file(tmp_path):
+    """tmp_path の YAML と、パース回数を数える yaml.safe_load のモック。"""
+    from src.utils import config_loader
+
+    path = tmp_path / "settings.yaml"
+    path.write_text("trading:\n  symbols: [BTC, ETH]\n")
+    config_loader._load_yaml_cached.cache_clear()
+    with patch.object(config_loader.yaml, "safe_load", wraps=config_loader.yaml.safe_load) as parse:
+        yield config_loader, path, parse
+    config_loader._load_yaml_cached.cache_clear()
+
+
+class TestLoadYamlCache:
+    def test_cached_until_changed(self, yaml_file):
+        """mtime・サイズが変わらなければ再パースしない。"""
+        config_loader, path, parse = yaml_file
+        assert config_loader.load_yaml(path) == {"trading": {"symbols": ["BTC", "ETH"]}}
+        config_loader.load_yaml(path)
+        assert parse.call_count == 1
+
+    def test_mtime_change_invalidates(self, yaml_file):
+        """同サイズでも mtime が変われば再パース。"""
+        config_loader, path, parse = yaml_file
+        config_loader.load_yaml(path)
+        st = path.stat()
+        path.write_text("trading:\n  symbols: [BTC, SOL]\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert config_loader.load_yaml(path)["trading"]["symbols"] == ["BTC", "SOL"]
+        assert parse.call_count == 2
+
+    def test_size_change_invalidates(self, yaml_file):
+        """mtime が同じでもサイズが変われば再パース (粗い mtime 分解能対策)。"""
+        config_loader, path, parse = yaml_file
+        config_loader.load_yaml(path)
+        st = path.stat()
+        path.write_text("trading:\n  symbols: [BTC, ETH, SOL]\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert config_loader.load_yaml(path)["trading"]["symbols"] == ["BTC", "ETH", "SOL"]
+        assert parse.call_count == 2
+
+    def test_mutation_does_not_leak(self, yaml_file):
+        """戻り値 (ネストした値を含む) を書き換えてもキャッシュに影響しない。"""
+        config_loader, path, parse = yaml_file
+        first = config_loader.load_yaml(path)
+        first["trading"]["symbols"].append("HYPE")
+        first["extra"] = 1
+        assert config_loader.load_yaml(path) == {"trading": {"symbols": ["BTC", "ETH"]}}
+        assert parse.call_count == 1
@@ -13,13 +13,15 @@
 - SOL imbalance<0.5 short WR: 29%
 """
 import sys
+from collections import Counter
 sys.path.insert(0, '/home/claw/myClaw')
 
-from src.hypothesis.manager import create_hypothesis, get_by_status, _load_all
+from src.hypothesis.manager import create_hypotheses_bulk, _load_all
 
-# 現在のactiveな仮説数確認
-raw = get_by_status('raw')
-shadow = get_by_status('shadow')
+# 現在のactiveな仮説数確認 (一覧は最後の集計でも使い回す)
+existing_hyps = _load_all()
+raw = [h for h in existing_hyps if h.get('status') == 'raw']
+shadow = [h for h in existing_hyps if h.get('status') == 'shadow']
 print(f"Current raw: {len(raw)}, shadow: {len(shadow)}")
 
 new_hypotheses = []
@@ -257,28 +259,33 @@ new_hypotheses.append({
     "prediction": {"symbol": "ETH", "direction": "short", "horizon_cycles": 3, "expected_move_pct": 0.2}
 })
 
-# 仮説を登録
+SOURCE = "coder_20260221_pattern_analysis"
+
+# 再実行時の重複登録を防ぐ: 同じ source で登録済みの description はスキップ
+registered = {h.get('description') for h in existing_hyps if h.get('source') == SOURCE}
+n_before = len(new_hypotheses)
+new_hypotheses = [h for h in new_hypotheses if h['description'] not in registered]
+if len(new_hypotheses) < n_before:
+    print(f"Skipped (already registered): {n_before - len(new_hypotheses)}")
+
+# 仮説を登録 (1回の読み込み・書き込みでまとめて登録)
 created = []
-for hyp_data in new_hypotheses:
-    result = create_hypothesis(
-        description=hyp_data['description'],
-        trigger=hyp_data['trigger'],
-        prediction=hyp_data['prediction'],
-        source="coder_20260221_pattern_analysis"
-    )
+results = create_hypotheses_bulk(new_hypotheses, source=SOURCE)
+msgs: list[str] = []
+for hyp_data, result in zip(new_hypotheses, results):
     if result:
         created.append(result['id'])
-        print(f"  Created: {result['id']}")
+        msgs.append(f"  Created: {result['id']}")
     else:
-        print(f"  FAILED (limit?): {hyp_data['description'][:60]}")
+        msgs.append(f"  FAILED (limit?): {hyp_data['description'][:60]}")
+if msgs:
+    sys.stdout.write("\n".join(msgs) + "\n")
+    sys.stdout.flush()
 
 print(f"\nTotal created: {len(created)}")
 print(f"IDs: {created}")
 
-# 最終状態確認
-all_hyps = _load_all()
-by_s = {}
-for h in all_hyps:
-    s = h['status']
-    by_s[s] = by_s.get(s, 0) + 1
+# 最終状態確認 (登録前の一覧 + 今回作成分。ファイルは読み直さない)
+all_hyps = existing_hyps + [r for r in results if r]
+by_s = dict(Counter(h['status'] for h in all_hyps))
 print(f"Final status counts: {by_s}")